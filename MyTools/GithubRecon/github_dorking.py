@@ -5,9 +5,39 @@ Searches GitHub using predefined dorks from org.txt or domain.txt files
 """
 
 import argparse
+import json
 import os
+import random
+import sqlite3
 import sys
+import threading
+import time
+import urllib.error
 import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+sys.path.insert(0, os.path.dirname(SCRIPT_DIR))
+try:
+    import wordlist_pack
+except ImportError:  # Only needed to read compiled wordlist packs
+    wordlist_pack = None
+
+# Dork file and the placeholder its templates use, per search type
+DORK_FILES = {
+    "org": ("org.txt", "org:example"),
+    "domain": ("domain.txt", '"example.com"'),
+}
+
+API_URL = "https://api.github.com"  # Code-search API base, point it at a mock server for testing
+PER_PAGE = 100  # Results per API page, the most GitHub allows
+MAX_SEARCH_RESULTS = 1000  # Code search never returns more than this per query
+MAX_RETRIES = 3  # Retries for network errors and 5xx responses
+REQUEST_TIMEOUT = 30  # Seconds per API request
+THROTTLE_WAIT = 60  # Seconds a token rests after a secondary rate limit without Retry-After
+CACHE_TTL_HOURS = 24.0  # Dorks fetched more recently than this are not searched again with -cache
 
 class Colors:
     BLUE = '\033[94m'
@@ -18,31 +48,473 @@ class Colors:
     UNDERLINE = '\033[4m'
     END = '\033[0m'
 
-def load_dork_file(file_path, search_term):
+class DorkTemplate:
     """
-    Load dork patterns from file and replace the placeholder with search term
+    One dork line split around its placeholder, so filling in a target is a
+    join instead of a search. The URL-encoded pieces are kept as well:
+    quoting is per character, so quote(a + b) == quote(a) + quote(b).
+    """
+    __slots__ = ('parts', 'quoted_parts')
+
+    def __init__(self, dork, placeholder):
+        self.parts = dork.split(placeholder)
+        self.quoted_parts = [urllib.parse.quote(part) for part in self.parts]
+
+    def render(self, replacement, quoted_replacement):
+        """Return (dork, GitHub search URL) for a target"""
+        dork = replacement.join(self.parts)
+        return dork, f"https://github.com/search?q={quoted_replacement.join(self.quoted_parts)}&type=code"
+
+def placeholder_value(search_type, search_term):
+    """What the placeholder of search_type becomes for search_term"""
+    return f"org:{search_term}" if search_type == "org" else f'"{search_term}"'
+
+def compile_dork_file(file_path, search_type):
+    """
+    Read a dork file (text or wordlist pack) once and return its
+    DorkTemplates, without repeated dorks
     """
+    _, placeholder = DORK_FILES[search_type]
     try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            content = file.read()
-        
-        # Replace placeholder based on file type
-        if "org.txt" in file_path:
-            # Replace org:example with org:search_term
-            content = content.replace("org:example", f"org:{search_term}")
-        elif "domain.txt" in file_path:
-            # Replace "example.com" with the actual domain
-            content = content.replace('"example.com"', f'"{search_term}"')
-        
-        # Split into individual dorks
-        dorks = [line.strip() for line in content.split('\n') if line.strip() and not line.startswith('#')]
-        return dorks
+        if wordlist_pack is not None and wordlist_pack.is_pack(file_path):
+            lines = wordlist_pack.load_wordlist(file_path)
+        else:
+            with open(file_path, 'r', encoding='utf-8') as file:
+                lines = file.read().split('\n')
     except FileNotFoundError:
         print(f"{Colors.RED}Error: Dork file '{file_path}' not found.{Colors.END}")
         sys.exit(1)
     except Exception as e:
         print(f"{Colors.RED}Error reading dork file: {e}{Colors.END}")
         sys.exit(1)
+    
+    # Split into individual dorks
+    dorks = dict.fromkeys(line.strip() for line in lines if line.strip() and not line.startswith('#'))
+    return [DorkTemplate(dork, placeholder) for dork in dorks]
+
+def render_dorks(templates, search_type, search_term):
+    """Return [(dork, url)] for one target"""
+    replacement = placeholder_value(search_type, search_term)
+    quoted_replacement = urllib.parse.quote(replacement)
+    return [template.render(replacement, quoted_replacement) for template in templates]
+
+def load_dork_file(file_path, search_term):
+    """
+    Load dork patterns from file and replace the placeholder with search term
+    """
+    search_type = "domain" if os.path.basename(file_path) == DORK_FILES["domain"][0] else "org"
+    return [dork for dork, _ in render_dorks(compile_dork_file(file_path, search_type), search_type, search_term)]
+
+def dork_file_path(search_type, dorks_dir=SCRIPT_DIR):
+    """Path of the dork file for search_type, next to this script unless dorks_dir says otherwise"""
+    return os.path.join(dorks_dir, DORK_FILES[search_type][0])
+
+def iter_targets(file_path, default_type):
+    """
+    Yield (search_type, search_term) from a targets file ('-' for stdin).
+    Lines may be prefixed with 'org:' or 'domain:', others use default_type.
+    """
+    f = sys.stdin if file_path == '-' else open(file_path, 'r', encoding='utf-8')
+    try:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            search_type, sep, term = line.partition(':')
+            if sep and search_type in DORK_FILES and term.strip():
+                yield search_type, term.strip()
+            elif default_type:
+                yield default_type, line
+            else:
+                print(f"{Colors.RED}Skipping '{line}': no -type given and no org:/domain: prefix{Colors.END}",
+                      file=sys.stderr)
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+def run_batch(args):
+    """Generate the dorks of every target in args.targets, one JSON line per target"""
+    templates = {}
+    for search_type in DORK_FILES:
+        path = dork_file_path(search_type, args.dorks_dir)
+        if os.path.exists(path):
+            templates[search_type] = compile_dork_file(path, search_type)
+    
+    out = sys.stdout if not args.output or args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    start = time.perf_counter()
+    targets = queries = 0
+    
+    def target_dorks():
+        for search_type, search_term in iter_targets(args.targets, args.type):
+            if search_type not in templates:
+                print(f"{Colors.RED}Error: Dork file '{dork_file_path(search_type, args.dorks_dir)}' not found.{Colors.END}",
+                      file=sys.stderr)
+                sys.exit(1)
+            yield search_type, search_term, render_dorks(templates[search_type], search_type, search_term)
+    
+    if args.execute:
+        jobs = (
+            (search_type, search_term, dork)
+            for search_type, search_term, dorks in target_dorks()
+            for dork, _ in dorks
+        )
+        try:
+            write_search_results(jobs, args, out)
+        finally:
+            if out is not sys.stdout:
+                out.close()
+        return
+    
+    try:
+        for search_type, search_term, dorks in target_dorks():
+            out.write(json.dumps({
+                "type": search_type,
+                "target": search_term,
+                "dorks": [{"dork": dork, "url": url} for dork, url in dorks],
+            }) + "\n")
+            targets += 1
+            queries += len(dorks)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    
+    print(f"{Colors.GREEN}Generated {queries} dorks for {targets} targets in "
+          f"{time.perf_counter() - start:.2f}s{Colors.END}", file=sys.stderr)
+
+class TokenState:
+    """What we know about one API token's quota"""
+    __slots__ = ('token', 'remaining', 'reset_at', 'blocked_until', 'in_flight', 'used')
+
+    def __init__(self, token):
+        self.token = token
+        self.remaining = None  # Unknown until the first response
+        self.reset_at = 0.0
+        self.blocked_until = 0.0
+        self.in_flight = 0
+        self.used = 0
+
+    def available(self, now):
+        """Requests this token may start right now"""
+        if self.blocked_until > now:
+            return 0
+        if self.remaining is None or (self.remaining <= 0 and self.reset_at <= now):
+            # Unknown or already reset quota, send one request to learn it
+            return 1 - self.in_flight
+        return self.remaining - self.in_flight
+
+class TokenPool:
+    """
+    Hands out API tokens within each one's quota. X-RateLimit-Remaining and
+    X-RateLimit-Reset of every response update the token, requests in
+    flight are reserved against what is left, and a token that is out of
+    quota or hit a secondary rate limit rests until its reset or Retry-After.
+    acquire() blocks until some token can be used.
+    """
+
+    def __init__(self, tokens):
+        self.states = [TokenState(token) for token in tokens]
+        self.condition = threading.Condition()
+
+    def acquire(self):
+        with self.condition:
+            while True:
+                now = time.time()
+                state = max(self.states, key=lambda state: state.available(now))
+                if state.available(now) > 0:
+                    state.in_flight += 1
+                    state.used += 1
+                    return state
+                
+                # Sleep until the earliest token rests no more, or a request finishes
+                wake = [max(state.blocked_until, state.reset_at) for state in self.states
+                        if max(state.blocked_until, state.reset_at) > now]
+                self.condition.wait(timeout=min(wake) - now + 0.5 if wake else None)
+
+    def release(self, state, status=None, headers=None, message=None):
+        """
+        Return a token, learning its quota from the response headers and
+        error message. True if the request was throttled.
+        """
+        throttled = False
+        with self.condition:
+            state.in_flight -= 1
+            if headers is not None:
+                now = time.time()
+                remaining = headers.get('X-RateLimit-Remaining')
+                reset = headers.get('X-RateLimit-Reset')
+                if remaining is not None and remaining.isdigit():
+                    state.remaining = int(remaining)
+                if reset is not None and reset.isdigit():
+                    state.reset_at = float(reset)
+                
+                if status in (403, 429):
+                    retry_after = headers.get('Retry-After')
+                    if retry_after is not None and retry_after.isdigit():
+                        state.blocked_until = now + int(retry_after)
+                        throttled = True
+                    elif state.remaining == 0:
+                        state.blocked_until = max(state.reset_at, now + 1)
+                        throttled = True
+                    elif status == 429 or 'secondary rate limit' in (message or '').lower():
+                        # A secondary limit may come as a bare 403, GitHub asks to wait at least a minute
+                        state.blocked_until = now + THROTTLE_WAIT
+                        throttled = True
+            self.condition.notify_all()
+        return throttled
+
+def load_tokens(value):
+    """API tokens from a file (one per line), a comma separated list, or $GITHUB_TOKENS / $GITHUB_TOKEN"""
+    if not value:
+        value = os.environ.get('GITHUB_TOKENS') or os.environ.get('GITHUB_TOKEN') or ''
+    if os.path.isfile(value):
+        with open(value, 'r', encoding='utf-8') as f:
+            return [line.strip() for line in f if line.strip() and not line.startswith('#')]
+    return [token.strip() for token in value.split(',') if token.strip()]
+
+def api_get(url, token, etag=None):
+    """GET an API URL, conditionally if etag is given, return (status, headers, parsed JSON body)"""
+    headers = {
+        "Accept": "application/vnd.github+json",
+        "Authorization": f"Bearer {token}",
+        "User-Agent": "github-dorking",
+        "X-GitHub-Api-Version": "2022-11-28",
+    }
+    if etag:
+        headers["If-None-Match"] = etag
+    request = urllib.request.Request(url, headers=headers)
+    try:
+        with urllib.request.urlopen(request, timeout=REQUEST_TIMEOUT) as response:
+            return response.status, response.headers, json.load(response)
+    except urllib.error.HTTPError as e:
+        try:
+            body = json.loads(e.read() or b'{}')
+        except ValueError:
+            body = {}
+        return e.code, e.headers, body
+
+def search_dork(pool, dork, api_url=API_URL, max_results=MAX_SEARCH_RESULTS, etag=None):
+    """
+    Run one dork against the code-search API, following pages until all
+    results (at most max_results) are in. Returns a result dict with the
+    total count, the hits and the first page's ETag, or an error. With
+    etag the first page is requested conditionally, and an unchanged
+    result comes back as not_modified without any further pages.
+    """
+    result = {"dork": dork, "total_count": 0, "items": []}
+    per_page = min(PER_PAGE, max_results)
+    limit = min(max_results, MAX_SEARCH_RESULTS)
+    page = 1
+    failures = 0
+    while True:
+        url = f"{api_url}/search/code?q={urllib.parse.quote(dork)}&per_page={per_page}&page={page}"
+        state = pool.acquire()
+        try:
+            status, headers, data = api_get(url, state.token, etag if page == 1 else None)
+        except (urllib.error.URLError, OSError, ValueError) as e:
+            pool.release(state)
+            failures += 1
+            if failures > MAX_RETRIES:
+                result["error"] = str(e)
+                return result
+            time.sleep(random.uniform(0, 2 ** failures))
+            continue
+        
+        message = data.get('message') if isinstance(data, dict) else None
+        if pool.release(state, status, headers, message):
+            continue  # Throttled, the token rests and another one retries this page
+        if status >= 500 and failures < MAX_RETRIES:
+            failures += 1
+            time.sleep(random.uniform(0, 2 ** failures))
+            continue
+        if status == 304:
+            result["not_modified"] = True
+            return result
+        if status != 200:
+            result["error"] = f"{status} {data.get('message', '')}".strip()
+            return result
+        
+        failures = 0
+        if page == 1:
+            result["etag"] = headers.get("ETag")
+        result["total_count"] = data.get("total_count", 0)
+        items = data.get("items") or []
+        for item in items:
+            result["items"].append({
+                "repository": (item.get("repository") or {}).get("full_name"),
+                "path": item.get("path"),
+                "sha": item.get("sha"),
+                "url": item.get("html_url"),
+            })
+        del result["items"][limit:]
+        
+        if (len(items) < per_page or len(result["items"]) >= min(result["total_count"], limit)
+                or page * per_page >= limit):
+            return result
+        page += 1
+
+def execute_dorks(jobs, pool, on_result, workers=4, api_url=API_URL, max_results=MAX_SEARCH_RESULTS):
+    """
+    Run (search_type, target, dork, etag) jobs on a thread pool, at most a
+    few per worker queued at a time so huge job lists stay lazy.
+    on_result(job, result) is called from this thread as searches finish.
+    """
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = {}
+        jobs = iter(jobs)
+        exhausted = False
+        while pending or not exhausted:
+            while not exhausted and len(pending) < workers * 2:
+                job = next(jobs, None)
+                if job is None:
+                    exhausted = True
+                    break
+                pending[executor.submit(search_dork, pool, job[2], api_url, max_results, job[3])] = job
+            if not pending:
+                break
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                on_result(pending.pop(future), future.result())
+
+class ResultCache:
+    """
+    Persistent SQLite store of dork results. Each dork remembers when it was
+    last fetched, its first page's ETag and total count; each hit
+    (repository, path, sha) remembers the run that first saw it, so a
+    repeat run can skip fresh dorks, ask GitHub whether a result changed
+    and report only hits it has not seen before.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS runs (
+            id INTEGER PRIMARY KEY,
+            started REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS dorks (
+            dork TEXT PRIMARY KEY,
+            search_type TEXT NOT NULL,
+            target TEXT NOT NULL,
+            etag TEXT,
+            total_count INTEGER NOT NULL,
+            fetched REAL NOT NULL
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS hits (
+            dork TEXT NOT NULL,
+            repository TEXT NOT NULL,
+            path TEXT NOT NULL,
+            sha TEXT NOT NULL,
+            url TEXT,
+            run INTEGER NOT NULL,
+            PRIMARY KEY (dork, repository, path, sha)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS hits_run ON hits (run);
+    """
+
+    def __init__(self, cache_file):
+        self.conn = sqlite3.connect(cache_file)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+        self.run = self.conn.execute("INSERT INTO runs (started) VALUES (?)", (time.time(),)).lastrowid
+
+    def get(self, dork):
+        """(etag, total_count, fetched) of a dork searched before, or None"""
+        return self.conn.execute(
+            "SELECT etag, total_count, fetched FROM dorks WHERE dork = ?", (dork,)
+        ).fetchone()
+
+    def store(self, search_type, target, result):
+        """Record a fresh search result, return the hits not seen in earlier runs"""
+        new = []
+        for item in result["items"]:
+            cursor = self.conn.execute(
+                "INSERT OR IGNORE INTO hits (dork, repository, path, sha, url, run) VALUES (?, ?, ?, ?, ?, ?)",
+                (result["dork"], item["repository"] or "", item["path"] or "", item["sha"] or "", item["url"], self.run)
+            )
+            if cursor.rowcount:
+                new.append(item)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO dorks (dork, search_type, target, etag, total_count, fetched) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (result["dork"], search_type, target, result.get("etag"), result["total_count"], time.time())
+        )
+        self.conn.commit()
+        return new
+
+    def touch(self, dork):
+        """An unchanged result (304) counts as freshly fetched"""
+        self.conn.execute("UPDATE dorks SET fetched = ? WHERE dork = ?", (time.time(), dork))
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+def open_pool(args):
+    """TokenPool from -tokens, or exit if there are no tokens"""
+    tokens = load_tokens(args.tokens)
+    if not tokens:
+        print(f"{Colors.RED}Error: -execute needs API tokens (-tokens or $GITHUB_TOKEN){Colors.END}", file=sys.stderr)
+        sys.exit(1)
+    return TokenPool(tokens)
+
+def write_search_results(jobs, args, out):
+    """
+    Execute (search_type, target, dork) jobs and write one JSON line per
+    dork to out, progress goes to stderr. With -cache, dorks fetched within
+    the TTL are skipped, the rest are asked for conditionally, and only
+    hits not seen in earlier runs are written.
+    """
+    pool = open_pool(args)
+    cache = ResultCache(args.cache) if args.cache else None
+    start = time.perf_counter()
+    searched = hits = errors = skipped = unchanged = 0
+    
+    def cached_jobs():
+        nonlocal skipped
+        ttl = args.cache_ttl * 3600
+        for search_type, search_term, dork in jobs:
+            entry = cache.get(dork) if cache is not None else None
+            if entry is not None and time.time() - entry[2] < ttl:
+                skipped += 1
+                continue
+            yield search_type, search_term, dork, entry[0] if entry is not None else None
+    
+    def on_result(job, result):
+        nonlocal searched, hits, errors, unchanged
+        search_type, search_term, dork, _ = job
+        searched += 1
+        if cache is not None and "error" not in result:
+            if result.get("not_modified"):
+                unchanged += 1
+                cache.touch(dork)
+                result["total_count"] = cache.get(dork)[1]
+            else:
+                result["items"] = cache.store(search_type, search_term, result)
+        result.pop("etag", None)
+        
+        out.write(json.dumps({"type": search_type, "target": search_term, **result}) + "\n")
+        out.flush()
+        hits += len(result["items"])
+        errors += "error" in result
+        if "error" in result:
+            status = result["error"]
+        elif result.get("not_modified"):
+            status = "not modified"
+        else:
+            status = f"{len(result['items'])} {'new ' if cache is not None else ''}hits"
+        print(f"{Colors.YELLOW}[{searched}] {search_term}: {dork[:70]} -> {status}{Colors.END}", file=sys.stderr)
+    
+    try:
+        execute_dorks(cached_jobs(), pool, on_result, args.workers, args.api_url.rstrip('/'), args.max_results)
+    finally:
+        if cache is not None:
+            cache.close()
+    elapsed = time.perf_counter() - start
+    print(f"{Colors.GREEN}Searched {searched} dorks in {elapsed:.1f}s ({searched / elapsed if elapsed else 0:.2f}/s), "
+          f"{hits} {'new ' if cache is not None else ''}hits, {errors} errors, requests per token: "
+          f"{', '.join(str(state.used) for state in pool.states)}{Colors.END}", file=sys.stderr)
+    if cache is not None:
+        print(f"{Colors.GREEN}Cache: {skipped} dorks skipped (fetched within {args.cache_ttl:g}h), "
+              f"{unchanged} not modified{Colors.END}", file=sys.stderr)
 
 def generate_github_url(dork):
     """
@@ -60,13 +532,42 @@ def main():
     parser = argparse.ArgumentParser(description='GitHub Dorking Tool')
     parser.add_argument('-org', type=str, help='Search by organization name')
     parser.add_argument('-domain', type=str, help='Search by domain name')
-    parser.add_argument('-o', '--output', type=str, help='Output file path to save URLs')
+    parser.add_argument('-targets', type=str,
+                        help="Batch mode: file of targets, one per line ('-' for stdin), written as JSONL")
+    parser.add_argument('-type', choices=sorted(DORK_FILES),
+                        help="Search type of batch targets without an 'org:' or 'domain:' prefix")
+    parser.add_argument('-dorks-dir', type=str, default=SCRIPT_DIR,
+                        help='Directory with org.txt and domain.txt (default: next to this script)')
+    parser.add_argument('-o', '--output', type=str,
+                        help='Output file path to save URLs (JSONL in batch and -execute mode, default stdout)')
+    parser.add_argument('-execute', action='store_true',
+                        help='Run the dorks against the code-search API instead of printing URLs')
+    parser.add_argument('-tokens', type=str,
+                        help='API tokens for -execute: a file with one per line or a comma separated list '
+                             '(default: $GITHUB_TOKENS or $GITHUB_TOKEN)')
+    parser.add_argument('-api-url', type=str, default=API_URL, help=f'Code-search API base URL (default: {API_URL})')
+    parser.add_argument('-workers', type=int, default=4, help='Dorks searched concurrently with -execute (default: 4)')
+    parser.add_argument('-max-results', type=int, default=MAX_SEARCH_RESULTS,
+                        help=f'Results fetched per dork with -execute (default: {MAX_SEARCH_RESULTS})')
+    parser.add_argument('-cache', type=str,
+                        help='SQLite result store for -execute: skip fresh dorks, send conditional requests '
+                             'and report only new hits')
+    parser.add_argument('-cache-ttl', type=float, default=CACHE_TTL_HOURS,
+                        help=f'Hours before a cached dork is searched again (default: {CACHE_TTL_HOURS:g})')
     
     args = parser.parse_args()
+    if args.max_results < 1:
+        parser.error("-max-results must be at least 1")
+    
+    if args.targets:
+        if args.org or args.domain:
+            parser.error("Cannot combine -targets with -org or -domain")
+        run_batch(args)
+        return
     
     # Validate arguments
     if not args.org and not args.domain:
-        parser.error("Either -org or -domain must be specified")
+        parser.error("Either -org, -domain or -targets must be specified")
     
     if args.org and args.domain:
         parser.error("Cannot use both -org and -domain simultaneously")
@@ -75,15 +576,14 @@ def main():
     if args.org:
         search_type = "org"
         search_term = args.org
-        dork_file = "org.txt"
     else:
         search_type = "domain"
         search_term = args.domain
-        dork_file = "domain.txt"
+    dork_file = dork_file_path(search_type, args.dorks_dir)
     
     # Check if dork file exists
     if not os.path.exists(dork_file):
-        print_colored(f"Error: Dork file '{dork_file}' not found in current directory.", Colors.RED)
+        print_colored(f"Error: Dork file '{dork_file}' not found.", Colors.RED)
         print_colored("Please make sure org.txt and domain.txt are in the same directory as this script.", Colors.RED)
         sys.exit(1)
     
@@ -95,15 +595,25 @@ def main():
     print()
     
     # Load and process dorks
-    dorks = load_dork_file(dork_file, search_term)
+    dorks = render_dorks(compile_dork_file(dork_file, search_type), search_type, search_term)
     
     print_colored(f"📋 Loaded {len(dorks)} dork patterns", Colors.GREEN)
     print()
     
+    if args.execute:
+        out = sys.stdout if not args.output or args.output == '-' else open(args.output, 'w', encoding='utf-8')
+        try:
+            write_search_results(((search_type, search_term, dork) for dork, _ in dorks), args, out)
+        finally:
+            if out is not sys.stdout:
+                out.close()
+        if args.output:
+            print_colored(f"💾 Results saved to: {args.output}", Colors.GREEN)
+        return
+    
     # Generate URLs
     urls = []
-    for i, dork in enumerate(dorks, 1):
-        url = generate_github_url(dork)
+    for i, (dork, url) in enumerate(dorks, 1):
         urls.append(url)
         
         # Print dork in yellow
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+JWT Secret Audit
+Tests HS256/HS384/HS512 tokens against a wordlist of candidate HMAC secrets on every CPU core
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import mmap
+import multiprocessing
+import os
+import re
+import signal
+import sys
+import time
+
+# Configuration
+WORDLIST_FILE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'wordlist', 'jwt_keys.txt')
+WORKERS = os.cpu_count() or 1  # Worker processes
+CHUNK_BYTES = 64 * 1024  # Slice of the wordlist per task, about 5k keys of jwt_keys.txt
+PROGRESS_INTERVAL = 1.0  # Seconds between progress lines
+
+ALGORITHMS = {  # alg -> (hash, block size)
+    "HS256": (hashlib.sha256, 64),
+    "HS384": (hashlib.sha384, 128),
+    "HS512": (hashlib.sha512, 128),
+}
+JWT_PATTERN = re.compile(r'eyJ[A-Za-z0-9_-]*\.[A-Za-z0-9_-]*\.[A-Za-z0-9_-]+')
+IPAD = bytes(x ^ 0x36 for x in range(256))
+OPAD = bytes(x ^ 0x5C for x in range(256))
+
+def b64url_decode(part):
+    """Base64url without padding, as used by JWS"""
+    return base64.urlsafe_b64decode(part + '=' * (-len(part) % 4))
+
+class Token:
+    """A parsed HMAC JWT: the signing input and signature are computed once, not per key"""
+
+    __slots__ = ('raw', 'alg', 'signing_input', 'signature')
+
+    def __init__(self, raw):
+        parts = raw.split('.')
+        if len(parts) != 3:
+            raise ValueError("not a compact JWS (header.payload.signature)")
+        header = json.loads(b64url_decode(parts[0]))
+        alg = header.get('alg') if isinstance(header, dict) else None
+        if alg not in ALGORITHMS:
+            raise ValueError(f"alg {alg!r} is not HMAC, nothing to crack")
+        signature = b64url_decode(parts[2])
+        if len(signature) != ALGORITHMS[alg][0]().digest_size:
+            raise ValueError(f"signature is {len(signature)} bytes, wrong size for {alg}")
+
+        self.raw = raw
+        self.alg = alg
+        self.signing_input = f"{parts[0]}.{parts[1]}".encode('ascii')
+        self.signature = signature
+
+def load_tokens(values, token_files):
+    """Parse tokens given directly and every JWT found in token files, skipping duplicates"""
+    raw_tokens = list(values)
+    for file_path in token_files:
+        try:
+            with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+                raw_tokens.extend(JWT_PATTERN.findall(f.read()))
+        except OSError as e:
+            print(f"Error: Cannot read token file {file_path}: {e}")
+            sys.exit(1)
+
+    tokens = []
+    for raw in dict.fromkeys(raw.strip() for raw in raw_tokens):
+        try:
+            tokens.append(Token(raw))
+        except (ValueError, UnicodeError) as e:
+            print(f"[!] Skipping {raw[:40]}...: {e}")
+    return tokens
+
+def plan_chunks(wordlist):
+    """
+    Split the wordlist into byte range tasks, cut at line ends so no key is
+    split between workers. Workers read their own range, nothing is sent
+    through the pool but the offsets.
+    """
+    chunks = []
+    with open(wordlist, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if not size:
+            return chunks
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            start = 0
+            while start < size:
+                stop = mm.find(b'\n', start + CHUNK_BYTES)
+                stop = size if stop == -1 else stop + 1
+                chunks.append((start, stop))
+                start = stop
+    return chunks
+
+# Worker state, set once per process by init_worker
+_tokens = None
+_cracked = None
+_source = None
+
+def init_worker(tokens, cracked, wordlist):
+    global _tokens, _cracked, _source
+    _tokens = tokens
+    _cracked = cracked
+    with open(wordlist, 'rb') as f:
+        _source = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+def init_pool_worker(tokens, cracked, wordlist):
+    # Ctrl+C is handled by the parent, which terminates the pool
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    init_worker(tokens, cracked, wordlist)
+
+def close_worker():
+    global _source
+    if _source is not None:
+        _source.close()
+        _source = None
+
+def read_keys(start, stop):
+    """
+    Candidate secrets of one chunk as bytes, exactly as written: only the
+    line end is removed, blank lines and leading '#' or spaces are secrets too
+    """
+    keys = _source[start:stop].split(b'\n')
+    if not keys[-1]:
+        keys.pop()
+    return [key[:-1] if key.endswith(b'\r') else key for key in keys]
+
+def crack_keys(keys, jobs, hash_new, block_size):
+    """
+    HMAC every key against every job (index, signing input, signature) of
+    one algorithm. The padded key hashes are built once per key and shared
+    by all tokens. Returns keys tested, HMACs computed and matches.
+    """
+    found = []
+    hmacs = 0
+    for tested, key in enumerate(keys, 1):
+        if len(key) > block_size:
+            key = hash_new(key).digest()
+        key = key.ljust(block_size, b'\0')
+        inner = hash_new(key.translate(IPAD))
+        outer = key.translate(OPAD)
+        matched = False
+        for job in jobs:
+            mac = inner.copy()
+            mac.update(job[1])
+            if hash_new(outer + mac.digest()).digest() == job[2]:
+                found.append((job[0], keys[tested - 1]))
+                matched = True
+        hmacs += len(jobs)
+        if matched:
+            # Each token has one secret, stop testing the ones just cracked
+            cracked = {index for index, _ in found}
+            jobs = [job for job in jobs if job[0] not in cracked]
+            if not jobs:
+                return tested, hmacs, found
+    return len(keys), hmacs, found
+
+def crack_chunk(chunk):
+    """Test one chunk of the wordlist against every token nobody has cracked yet"""
+    pending = {}
+    for index, token in enumerate(_tokens):
+        if not _cracked[index]:
+            pending.setdefault(token.alg, []).append((index, token.signing_input, token.signature))
+    if not pending:
+        return 0, 0, []
+
+    keys = read_keys(*chunk)
+    tested = hmacs = 0
+    found = []
+    for alg, jobs in pending.items():
+        alg_tested, alg_hmacs, alg_found = crack_keys(keys, jobs, *ALGORITHMS[alg])
+        tested = max(tested, alg_tested)
+        hmacs += alg_hmacs
+        found.extend(alg_found)
+    for index, _ in found:
+        _cracked[index] = 1
+    return tested, hmacs, found
+
+def audit(tokens, wordlist, workers=WORKERS, on_progress=None):
+    """
+    Run the wordlist against all tokens at once, so each key is read and
+    padded a single time. Stops as soon as every token is cracked.
+    Returns {token index: secret} and run statistics.
+    """
+    chunks = plan_chunks(wordlist)
+    cracked = multiprocessing.Array('b', len(tokens), lock=False)
+    stats = {"chunks": len(chunks), "chunks_done": 0, "keys": 0, "hmacs": 0, "seconds": 0.0}
+    found = {}
+
+    start = time.perf_counter()
+    pool = None
+    if workers > 1 and len(chunks) > 1:
+        pool = multiprocessing.Pool(workers, init_pool_worker, (tokens, cracked, wordlist))
+        results = pool.imap_unordered(crack_chunk, chunks)
+    else:
+        init_worker(tokens, cracked, wordlist)
+        results = map(crack_chunk, chunks)
+
+    try:
+        for keys, hmacs, matches in results:
+            stats["chunks_done"] += 1
+            stats["keys"] += keys
+            stats["hmacs"] += hmacs
+            for index, key in matches:
+                found[index] = key
+            stats["seconds"] = time.perf_counter() - start
+            if on_progress:
+                on_progress(stats, found)
+            if len(found) == len(tokens):
+                break
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+        else:
+            close_worker()
+
+    stats["seconds"] = time.perf_counter() - start
+    stats["keys_per_sec"] = stats["keys"] / stats["seconds"] if stats["seconds"] else 0.0
+    stats["hmacs_per_sec"] = stats["hmacs"] / stats["seconds"] if stats["seconds"] else 0.0
+    return found, stats
+
+def show_secret(key):
+    return key.decode('utf-8', errors='backslashreplace')
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Test HMAC-signed JWTs against a wordlist of candidate secrets')
+    parser.add_argument('tokens', nargs='*', help='Tokens to audit')
+    parser.add_argument('-f', '--token-file', action='append', default=[],
+                        help='File to take every JWT from, e.g. a proxy log (repeatable)')
+    parser.add_argument('-w', '--wordlist', default=WORDLIST_FILE_PATH,
+                        help='Candidate secrets, one per line (default: wordlist/jwt_keys.txt)')
+    parser.add_argument('-j', '--workers', type=int, default=WORKERS,
+                        help=f'Worker processes (default: {WORKERS})')
+    parser.add_argument('-o', '--output', help='Write results as JSON to this file')
+    return parser.parse_args()
+
+def main():
+    args = parse_arguments()
+    tokens = load_tokens(args.tokens, args.token_file)
+    if not tokens:
+        print("Error: No HMAC-signed JWTs to audit")
+        sys.exit(1)
+    if not os.path.isfile(args.wordlist):
+        print(f"Error: Wordlist not found: {args.wordlist}")
+        sys.exit(1)
+
+    print(f"[+] Auditing {len(tokens)} tokens against {args.wordlist} with {args.workers} workers")
+    last_report = [time.monotonic()]
+
+    def on_progress(stats, found):
+        now = time.monotonic()
+        if now - last_report[0] >= PROGRESS_INTERVAL:
+            last_report[0] = now
+            print(f"[*] {stats['chunks_done']}/{stats['chunks']} chunks, {stats['keys']:,} keys, "
+                  f"{stats['keys'] / stats['seconds']:,.0f} keys/s, {len(found)}/{len(tokens)} cracked")
+
+    try:
+        found, stats = audit(tokens, args.wordlist, max(1, args.workers), on_progress)
+    except KeyboardInterrupt:
+        print("\n[!] Interrupted")
+        sys.exit(1)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    print(f"\n[+] Tested {stats['keys']:,} keys in {stats['seconds']:.2f}s: "
+          f"{stats['keys_per_sec']:,.0f} keys/s, {stats['hmacs_per_sec']:,.0f} HMACs/s")
+    print(f"[+] Cracked {len(found)}/{len(tokens)} tokens")
+    for index, token in enumerate(tokens):
+        if index in found:
+            print(f"    - {token.alg} {token.raw[:40]}... secret: {show_secret(found[index])!r}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({
+                "wordlist": args.wordlist,
+                "keys_tested": stats["keys"],
+                "seconds": round(stats["seconds"], 3),
+                "keys_per_sec": round(stats["keys_per_sec"], 1),
+                "tokens": [{
+                    "token": token.raw,
+                    "alg": token.alg,
+                    "secret": show_secret(found[index]) if index in found else None,
+                } for index, token in enumerate(tokens)],
+            }, f, indent=2)
+        print(f"[+] Results written to: {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+jwt_secret_audit Benchmark
+Signs synthetic tokens with known wordlist keys and times the audit against a one-token-at-a-time baseline
+"""
+
+import argparse
+import base64
+import hmac
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import jwt_secret_audit  # noqa: E402
+
+DEFAULT_TOKENS = "1,10,50"
+DEFAULT_WORKERS = f"1,{os.cpu_count() or 1}"
+DIGESTS = {"HS256": "sha256", "HS384": "sha384", "HS512": "sha512"}
+
+def b64url(data):
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+def sign_token(rng, key, alg):
+    """A synthetic JWT signed with hmac directly, independently of the auditor"""
+    header = b64url(json.dumps({"alg": alg, "typ": "JWT"}).encode())
+    payload = b64url(json.dumps({
+        "sub": str(rng.randint(1, 10 ** 6)),
+        "iat": 1700000000 + rng.randint(0, 10 ** 7),
+        "role": rng.choice(["user", "admin", "support"]),
+    }).encode())
+    signature = hmac.new(key, f"{header}.{payload}".encode('ascii'), DIGESTS[alg]).digest()
+    return f"{header}.{payload}.{b64url(signature)}"
+
+def read_keys(wordlist):
+    with open(wordlist, 'rb') as f:
+        keys = f.read().split(b'\n')
+    if not keys[-1]:
+        keys.pop()
+    return [key[:-1] if key.endswith(b'\r') else key for key in keys]
+
+def make_tokens(rng, keys, count, unknown):
+    """
+    count tokens signed with random wordlist keys, cycling through the
+    algorithms. With unknown, the last one has a secret not in the list so
+    the whole wordlist gets scanned.
+    """
+    algs = list(DIGESTS)
+    expected = []
+    for i in range(count):
+        if unknown and i == count - 1:
+            key = f"not-in-wordlist-{rng.getrandbits(64):016x}".encode()
+            expected.append((sign_token(rng, key, algs[i % 3]), None))
+        else:
+            key = rng.choice(keys)
+            expected.append((sign_token(rng, key, algs[i % 3]), key))
+    return expected
+
+def baseline(tokens, keys):
+    """The ad-hoc way: one token at a time, hmac.new for every key, single core"""
+    found = {}
+    start = time.perf_counter()
+    trials = 0
+    for index, token in enumerate(tokens):
+        digest = DIGESTS[token.alg]
+        for key in keys:
+            trials += 1
+            if hmac.compare_digest(hmac.new(key, token.signing_input, digest).digest(), token.signature):
+                found[index] = key
+                break
+    return found, trials, time.perf_counter() - start
+
+def check(found, tokens, expected, scenario):
+    """Every known secret must be recovered (any key that verifies is fine for duplicates)"""
+    for index, (_, key) in enumerate(expected):
+        if key is None:
+            if index in found:
+                print(f"Error: {scenario}: token {index} cracked with {found[index]!r} but its secret is not in the wordlist")
+                sys.exit(1)
+            continue
+        if index not in found:
+            print(f"Error: {scenario}: token {index} not cracked, its secret is {key!r}")
+            sys.exit(1)
+        token = tokens[index]
+        if hmac.new(found[index], token.signing_input, DIGESTS[token.alg]).digest() != token.signature:
+            print(f"Error: {scenario}: token {index} reported with a wrong secret {found[index]!r}")
+            sys.exit(1)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark jwt_secret_audit on synthetic tokens')
+    parser.add_argument('--tokens', default=DEFAULT_TOKENS,
+                        help=f'Comma separated token counts (default: {DEFAULT_TOKENS})')
+    parser.add_argument('--workers', default=DEFAULT_WORKERS,
+                        help=f'Comma separated worker counts (default: {DEFAULT_WORKERS})')
+    parser.add_argument('-w', '--wordlist', default=jwt_secret_audit.WORDLIST_FILE_PATH,
+                        help='Candidate secrets (default: wordlist/jwt_keys.txt)')
+    parser.add_argument('--seed', type=int, default=1337, help='Generator seed (default: 1337)')
+    parser.add_argument('--no-baseline', action='store_true', help='Skip the one-token-at-a-time baseline')
+    parser.add_argument('--label', default='', help='Free-form label stored in the results, e.g. a git revision')
+    parser.add_argument('-o', '--output', default='jwt_bench.json', help='JSON results file')
+    args = parser.parse_args()
+
+    try:
+        token_counts = [int(count) for count in args.tokens.split(',') if count.strip()]
+        worker_counts = [int(count) for count in args.workers.split(',') if count.strip()]
+    except ValueError:
+        parser.error("--tokens and --workers must be comma separated lists of integers")
+    if not os.path.isfile(args.wordlist):
+        print(f"Error: Wordlist not found: {args.wordlist}")
+        sys.exit(1)
+
+    keys = read_keys(args.wordlist)
+    print(f"[+] {len(keys):,} candidate keys from {args.wordlist}, {os.cpu_count()} CPUs")
+    results = []
+
+    for count in token_counts:
+        rng = random.Random(f"{args.seed}-{count}")
+        # full_scan has one secret missing from the wordlist, early_stop has all of them
+        for scenario, unknown in (("full_scan", True), ("early_stop", False)):
+            expected = make_tokens(rng, keys, count, unknown)
+            tokens = [jwt_secret_audit.Token(raw) for raw, _ in expected]
+            name = f"{count} tokens {scenario}"
+            print(f"[+] {name}")
+
+            runs = []
+            for workers in worker_counts:
+                found, stats = jwt_secret_audit.audit(tokens, args.wordlist, workers)
+                check(found, tokens, expected, name)
+                runs.append({
+                    "workers": workers,
+                    "seconds": round(stats["seconds"], 4),
+                    "keys_tested": stats["keys"],
+                    "keys_per_sec": round(stats["keys_per_sec"], 1),
+                    "hmacs_per_sec": round(stats["hmacs_per_sec"], 1),
+                })
+                print(f"    - {workers:>3} workers {stats['seconds']:>8.3f}s {stats['keys']:>9,} keys "
+                      f"{stats['keys_per_sec']:>11,.0f} keys/s {stats['hmacs_per_sec']:>11,.0f} HMACs/s")
+
+            result = {"tokens": count, "scenario": scenario, "runs": runs}
+            if not args.no_baseline:
+                found, trials, seconds = baseline(tokens, keys)
+                check(found, tokens, expected, f"{name} baseline")
+                result["baseline"] = {
+                    "seconds": round(seconds, 4),
+                    "hmacs_per_sec": round(trials / seconds, 1) if seconds else None,
+                }
+                print(f"    - baseline    {seconds:>8.3f}s {trials:>9,} HMACs "
+                      f"{trials / seconds if seconds else 0:>11,.0f} HMACs/s")
+            results.append(result)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump({
+            "label": args.label,
+            "seed": args.seed,
+            "wordlist_keys": len(keys),
+            "cpus": os.cpu_count(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime('%Y-%m-%dT%H:%M:%S'),
+            "results": results,
+        }, f, indent=2)
+    print(f"\n[+] Results written to: {args.output}")
+
+if __name__ == "__main__":
+    main()
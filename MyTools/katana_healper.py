@@ -5,107 +5,856 @@ Organizes URLs by file extension and builds directory structure maps
 """
 
 import argparse
+import contextlib
+import gzip
+import hashlib
+import heapq
+import io
+import math
+import mmap
 import re
-from urllib.parse import urlparse, unquote
+import sqlite3
+import tempfile
+import time
+from urllib.parse import urlparse, unquote, parse_qsl
 import os
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 import sys
 
+try:
+    import zstandard
+except ImportError:  # zstd input is optional
+    zstandard = None
+
+try:
+    import wordlist_pack
+except ImportError:  # Only needed to read compiled wordlist packs
+    wordlist_pack = None
+
+GZIP_MAGIC = b'\x1f\x8b'
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+# Path segments and parameter values that only identify an instance of an endpoint
+INT_PATTERN = re.compile(r'^\d+$')
+UUID_PATTERN = re.compile(r'^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$', re.IGNORECASE)
+HASH_PATTERN = re.compile(r'^[0-9a-f]{16,}$', re.IGNORECASE)
+
+WORDLIST_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'wordlist')
+DEFAULT_PATH_WORDLIST = os.path.join(WORDLIST_DIR, 'api', 'api1and2.txt')
+DEFAULT_PARAM_WORDLIST = os.path.join(WORDLIST_DIR, 'parameter', 'param.txt')
+
+WRITE_BUFFER_SIZE = 1 << 20  # Bytes buffered per output file
+MERGE_FAN_IN = 64  # Sorted runs merged at once, bounds open files during the merge
+
 def parse_arguments():
     """Parse command line arguments"""
     parser = argparse.ArgumentParser(description='Organize URLs by file extension and build directory maps')
-    parser.add_argument('-i', '--input', required=True, help='Input file containing URLs')
+    parser.add_argument('-i', '--input', required=True,
+                        help="Input file containing URLs ('-' for stdin, gzip/zstd detected automatically)")
     parser.add_argument('-o', '--output', required=True, help='Output file for organized results')
+    parser.add_argument('--stream', action='store_true',
+                        help='Stream the input in a single pass and keep only unique URLs, '
+                             'so memory follows the size of the report instead of the input')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Parse the input in N processes, one byte-range shard each (default: 1)')
+    parser.add_argument('--index', help='SQLite index of previous crawls to merge this crawl into')
+    parser.add_argument('--new-output',
+                        help='Write only the URLs, directories and extensions not seen before in --index')
+    parser.add_argument('--dedup', action='store_true',
+                        help='Collapse numeric, UUID and hash-like path segments and all parameter '
+                             'values into templates and keep only a few URLs per template')
+    parser.add_argument('--exemplars', type=int, default=1,
+                        help='URLs to keep per template with --dedup (default: 1)')
+    parser.add_argument('--bloom', type=int, metavar='CAPACITY',
+                        help='Track templates in a Bloom filter sized for CAPACITY templates '
+                             'instead of an exact set (fixed memory, rare false drops)')
+    parser.add_argument('--sort-buffer', type=int, metavar='URLS',
+                        help='Keep at most URLS URLs per extension group in memory and spill '
+                             'sorted runs to disk, merging them when the report is written')
+    parser.add_argument('--tmp-dir', help='Directory for spilled sorted runs (default: system temp)')
+    parser.add_argument('--split-dir',
+                        help='Also write every extension group, sorted, to its own file in this '
+                             'directory (js.txt, php.txt, no-extension.txt, ...)')
+    parser.add_argument('--tag', action='store_true',
+                        help='Tag URLs with matching API paths and parameter names from the bundled '
+                             'wordlists (wordlist/api/api1and2.txt, wordlist/parameter/param.txt)')
+    parser.add_argument('--tag-paths', action='append', metavar='WORDLIST',
+                        help='Wordlist (text or pack) of path patterns (e.g. api/auth/login) to tag URLs with; repeatable')
+    parser.add_argument('--tag-params', action='append', metavar='WORDLIST',
+                        help='Wordlist (text or pack) of query parameter names to tag URLs with; repeatable')
     return parser.parse_args()
 
-def extract_extension(url):
-    """Extract file extension from URL"""
-    parsed = urlparse(url)
-    path = unquote(parsed.path)
+class UrlRecord:
+    """A URL parsed once and shared by every stage of the pipeline"""
+    __slots__ = ('url', 'host', 'path', 'query', 'extension')
+
+    def __init__(self, url, host, path, query, extension):
+        self.url = url
+        self.host = host
+        self.path = path
+        self.query = query
+        self.extension = extension
+
+def _path_extension(path):
+    """Extract file extension from an already decoded URL path"""
+    filename = path.split('/')[-1]
     
     # Handle URLs without extensions
-    if '.' not in path.split('/')[-1]:
+    if '.' not in filename:
         return 'no-extension'
     
     # Extract extension (last part after last dot)
-    filename = path.split('/')[-1]
-    if '.' in filename:
-        return filename.split('.')[-1].lower()
-    return 'no-extension'
+    return filename.split('.')[-1].lower()
+
+def parse_url(url):
+    """Parse and decode a URL once, returning a UrlRecord"""
+    parsed = urlparse(url)
+    path = unquote(parsed.path)
+    return UrlRecord(url, parsed.netloc.lower(), path, parsed.query, _path_extension(path))
+
+def extract_extension(url):
+    """Extract file extension from URL"""
+    return parse_url(url).extension
+
+def split_path(path):
+    """Split a decoded URL path into its directory names and trailing file name (or None)"""
+    # Remove leading/trailing slashes and split
+    clean_path = path.strip('/')
+    if not clean_path:
+        return [], None
+    parts = clean_path.split('/')
+    
+    # Only the last segment can be a file, and only if it has a dot
+    filename = parts.pop() if '.' in parts[-1] else None
+    return [part for part in parts if part], filename  # Skip empty directory names
+
+def _value_placeholder(value):
+    """Return the placeholder for an instance-specific value, or None"""
+    if INT_PATTERN.match(value):
+        return '{int}'
+    if UUID_PATTERN.match(value):
+        return '{uuid}'
+    if HASH_PATTERN.match(value):
+        return '{hash}'
+    return None
+
+def url_template(record):
+    """
+    Normalize a UrlRecord into its endpoint template, e.g.
+    https://x.com/user/1?id=5&q=a -> x.com/user/{int}?id={int}&q={str}
+    """
+    segments = [_value_placeholder(segment) or segment for segment in record.path.split('/')]
+    template = record.host + '/'.join(segments)
+    
+    if record.query:
+        params = sorted(
+            (name, _value_placeholder(value) or '{str}')
+            for name, value in parse_qsl(record.query, keep_blank_values=True)
+        )
+        template += '?' + '&'.join(f"{name}={value}" for name, value in params)
+    
+    return template
+
+class BloomFilter:
+    """Fixed-size Bloom filter over byte strings"""
+
+    def __init__(self, capacity, error_rate=0.001):
+        capacity = max(capacity, 1)
+        self.size = max(int(-capacity * math.log(error_rate) / (math.log(2) ** 2)), 8)
+        self.hashes = max(int(round(self.size / capacity * math.log(2))), 1)
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def add(self, key):
+        """Add key, returning True if it was not already present"""
+        digest = hashlib.blake2b(key, digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        
+        added = False
+        for i in range(self.hashes):
+            bit = (h1 + i * h2) % self.size
+            byte, mask = bit >> 3, 1 << (bit & 7)
+            if not self.bits[byte] & mask:
+                self.bits[byte] |= mask
+                added = True
+        return added
+
+class UrlDeduplicator:
+    """
+    Collapse URLs onto endpoint templates and admit at most `exemplars` URLs
+    per template. Templates are tracked as 64-bit digests in a dict, or as
+    (template, slot) keys in a BloomFilter when bloom_capacity is given.
+    """
+
+    def __init__(self, exemplars=1, bloom_capacity=None):
+        self.exemplars = exemplars
+        self.bloom = BloomFilter(bloom_capacity * exemplars) if bloom_capacity else None
+        self.counts = {}
+        self.kept = 0
+        self.dropped = 0
+
+    def admit(self, record):
+        """Return True if record should be kept"""
+        template = url_template(record).encode('utf-8', 'surrogatepass')
+        
+        if self.bloom is None:
+            key = hashlib.blake2b(template, digest_size=8).digest()
+            seen = self.counts.get(key, 0)
+            keep = seen < self.exemplars
+            if keep:
+                self.counts[key] = seen + 1
+        else:
+            # Slot n of a template is taken once n URLs of that template were kept
+            keep = any(self.bloom.add(template + b'\0' + str(slot).encode())
+                       for slot in range(self.exemplars))
+        
+        if keep:
+            self.kept += 1
+        else:
+            self.dropped += 1
+        return keep
+
+class UrlTagger:
+    """
+    Tag URLs with the wordlist entries they contain, in one pass per URL.
+    Path patterns may span several segments (api/auth/login), so they are
+    matched with an Aho-Corasick automaton whose alphabet is whole,
+    lowercased path segments. Parameter names are a single dict lookup.
+    """
+
+    def __init__(self):
+        self._goto = [{}]     # state -> {segment: next state}
+        self._fail = [0]      # state -> failure state
+        self._output = [()]   # state -> tags of patterns ending here
+        self._params = {}     # lowercased parameter name -> tag
+        self._built = False
+        self.tag_groups = defaultdict(set)
+
+    def add_path_pattern(self, pattern):
+        """
+        Add a path pattern such as 'api/auth/login/'. Patterns without a
+        letter (ids like '15', punctuation like '-') are skipped: they would
+        tag every URL with an id segment and bury the endpoint tags.
+        """
+        segments = [segment for segment in pattern.lower().split('/') if segment]
+        if not any(char.isalpha() for segment in segments for char in segment):
+            return
+        
+        state = 0
+        for segment in segments:
+            next_state = self._goto[state].get(segment)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][sys.intern(segment)] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+            state = next_state
+        
+        tag = 'path:' + '/'.join(segments)
+        if tag not in self._output[state]:
+            self._output[state] += (tag,)
+        self._built = False
+
+    def add_param_name(self, name):
+        """Add a query parameter name"""
+        name = name.strip().lower()
+        if name:
+            self._params[name] = 'param:' + name
+
+    @staticmethod
+    def _read_wordlist(wordlist):
+        """Entries of a text wordlist or of a wordlist pack"""
+        if wordlist_pack is not None and wordlist_pack.is_pack(wordlist):
+            with wordlist_pack.WordlistPack(wordlist) as pack:
+                yield from pack
+            return
+        with open(wordlist, 'r', encoding='utf-8', errors='ignore') as f:
+            for line in f:
+                entry = line.strip()
+                if entry and not entry.startswith('#'):
+                    yield entry
+
+    def load_path_wordlist(self, wordlist):
+        for entry in self._read_wordlist(wordlist):
+            self.add_path_pattern(entry)
+
+    def load_param_wordlist(self, wordlist):
+        for entry in self._read_wordlist(wordlist):
+            self.add_param_name(entry)
+
+    def build(self):
+        """Compute failure links breadth-first and fold outputs along them"""
+        queue = list(self._goto[0].values())
+        for state in queue:
+            self._fail[state] = 0
+        
+        for state in queue:  # queue grows while it is walked
+            for segment, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and segment not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(segment, 0)
+                self._fail[child] = target if target != child else 0
+                self._output[child] += self._output[self._fail[child]]
+        self._built = True
+
+    def match(self, record):
+        """Return the set of tags for a UrlRecord"""
+        if not self._built:
+            self.build()
+        
+        tags = set()
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for segment in record.path.lower().split('/'):
+            if not segment:
+                continue
+            while state and segment not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(segment, 0)
+            if output[state]:
+                tags.update(output[state])
+        
+        if record.query and self._params:
+            for name, _ in parse_qsl(record.query, keep_blank_values=True):
+                tag = self._params.get(name.lower())
+                if tag is not None:
+                    tags.add(tag)
+        return tags
+
+    def add(self, record):
+        """Tag a UrlRecord and add it to the groups of its tags"""
+        for tag in self.match(record):
+            self.tag_groups[tag].add(record.url)
+
+    def merge(self, tag_groups):
+        """Merge the tag groups of a tagger that ran in another process"""
+        for tag, urls in tag_groups.items():
+            self.tag_groups[tag].update(urls)
+
+class DirectoryTree:
+    """
+    Compact path trie used as the directory map.
+    Nodes are integer ids into parallel lists, so a directory costs one dict
+    entry in its parent rather than a full joined path string, and segment
+    names are interned so repeated names across the site share one string.
+    """
+    __slots__ = ('_children', '_files')
+
+    def __init__(self):
+        # Node 0 is the root; entries stay None until a node gets children/files
+        self._children = [None]  # node id -> {segment name: child node id}
+        self._files = [None]     # node id -> set of file names
+
+    def __bool__(self):
+        return bool(self._children[0] or self._files[0])
+
+    def _add_child(self, node, name):
+        """Return the id of the named child of node, creating it if needed"""
+        kids = self._children[node]
+        if kids is None:
+            kids = self._children[node] = {}
+        child = kids.get(name)
+        if child is None:
+            child = len(self._children)
+            kids[sys.intern(name)] = child
+            self._children.append(None)
+            self._files.append(None)
+        return child
+
+    def _add_file(self, node, name):
+        """Add a file name to node"""
+        files = self._files[node]
+        if files is None:
+            files = self._files[node] = set()
+        files.add(sys.intern(name))
+
+    def add_path(self, path):
+        """Add one decoded URL path to the tree"""
+        dirs, filename = split_path(path)
+        
+        node = 0
+        for name in dirs:
+            node = self._add_child(node, name)
+        if filename is not None:
+            self._add_file(node, filename)
+
+    def merge(self, other):
+        """Merge another DirectoryTree into this one"""
+        stack = [(0, 0)]
+        while stack:
+            node, other_node = stack.pop()
+            
+            files = other._files[other_node]
+            if files:
+                for name in files:
+                    self._add_file(node, name)
+            
+            kids = other._children[other_node]
+            if kids:
+                for name, other_child in kids.items():
+                    stack.append((self._add_child(node, name), other_child))
+
+    def _entries(self, node):
+        """Yield (name, child id or None for files, is_last) for node in display order"""
+        kids = self._children[node] or {}
+        files = sorted(self._files[node] or ())
+        dirs = sorted(kids)
+        
+        for i, name in enumerate(dirs):
+            yield name, kids[name], (i == len(dirs) - 1) and not files
+        for i, name in enumerate(files):
+            yield name, None, i == len(files) - 1
+
+    def iter_lines(self):
+        """Yield the rendered tree line by line, without recursion"""
+        # One pending entry iterator per open level, never the whole rendering
+        stack = [(self._entries(0), "")]
+        while stack:
+            entries, prefix = stack[-1]
+            entry = next(entries, None)
+            if entry is None:
+                stack.pop()
+                continue
+            
+            name, child, is_last = entry
+            connector = "└── " if is_last else "├── "
+            if child is None:
+                yield f"{prefix}{connector}{name}\n"
+            else:
+                yield f"{prefix}{connector}{name}/\n"
+                stack.append((self._entries(child), prefix + ("    " if is_last else "│   ")))
 
 def build_directory_map(urls):
     """Build a hierarchical directory map from URLs without duplicates"""
-    dir_structure = defaultdict(lambda: defaultdict(set))
+    dir_structure = DirectoryTree()
+    
+    for url in urls:
+        dir_structure.add_path(parse_url(url).path)
+    
+    return dir_structure
+
+def _drop_repeats(sorted_urls):
+    """Yield sorted URLs, skipping consecutive duplicates"""
+    last = None
+    for url in sorted_urls:
+        if url != last:
+            yield url
+            last = url
+
+class SpillingGroup:
+    """
+    URL collection for one extension group that never holds more than
+    run_size URLs in memory. Full buffers are sorted and spilled to a run
+    file in tmp_dir; iter_sorted() k-way merges the runs back in order.
+    With unique=True duplicates are dropped, also across runs.
+    """
+
+    def __init__(self, run_size, tmp_dir, unique=False):
+        self.run_size = run_size
+        self.tmp_dir = tmp_dir
+        self.unique = unique
+        self.buffer = set() if unique else []
+        self.runs = []
+        self.count = 0  # Exact once finalized, or for non-unique groups
+        self.finalized = True
+
+    def add(self, url):
+        if self.unique:
+            self.buffer.add(url)
+        else:
+            self.buffer.append(url)
+            self.count += 1
+        self.finalized = False
+        if len(self.buffer) >= self.run_size:
+            self._spill()
+
+    append = add
+
+    def update(self, urls):
+        for url in urls:
+            self.add(url)
+
+    extend = update
+
+    def _write_run(self, urls):
+        """Write already sorted URLs to a new run file and return its path"""
+        fd, path = tempfile.mkstemp(suffix='.run', dir=self.tmp_dir)
+        with open(fd, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as f:
+            f.writelines(f"{url}\n" for url in urls)
+        return path
+
+    def _spill(self):
+        self.runs.append(self._write_run(sorted(self.buffer)))
+        self.buffer = set() if self.unique else []
+
+    @staticmethod
+    def _read_run(path):
+        with open(path, 'r', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as f:
+            for line in f:
+                yield line[:-1]
+
+    def _merged(self, runs):
+        """Merge run files in sorted order, dropping duplicates for unique groups"""
+        merged = heapq.merge(*(self._read_run(path) for path in runs))
+        return _drop_repeats(merged) if self.unique else merged
+
+    def _finalize(self):
+        """Reduce everything to at most MERGE_FAN_IN runs and compute the exact count"""
+        if self.finalized:
+            return
+        if self.buffer:
+            self._spill()
+        
+        while len(self.runs) > MERGE_FAN_IN or (self.unique and len(self.runs) > 1):
+            batch, self.runs = self.runs[:MERGE_FAN_IN], self.runs[MERGE_FAN_IN:]
+            self.runs.append(self._write_run(self._merged(batch)))
+            for path in batch:
+                os.remove(path)
+        
+        if self.unique:
+            self.count = sum(1 for _ in self._read_run(self.runs[0])) if self.runs else 0
+        self.finalized = True
+
+    def __len__(self):
+        self._finalize()
+        return self.count
+
+    def iter_sorted(self):
+        """Yield every URL of the group in sorted order"""
+        self._finalize()
+        return self._merged(self.runs)
+
+    def __iter__(self):
+        return self.iter_sorted()
+
+def sorted_urls(urls):
+    """Return the URLs of an extension group in sorted order"""
+    if isinstance(urls, SpillingGroup):
+        return urls.iter_sorted()
+    return sorted(urls)
+
+def organize_urls(urls, unique=False, on_record=None, keep=None, new_group=None):
+    """
+    Group URLs by extension and build the directory map in one pass,
+    parsing every URL exactly once. keep, if given, decides whether a
+    UrlRecord is used at all; on_record is called with every kept record.
+    new_group creates the container of an extension group (default set
+    or list). Returns (extension_groups, dir_structure, count) where count
+    includes the URLs that were not kept.
+    """
+    extension_groups = defaultdict(new_group or (set if unique else list))
+    dir_structure = DirectoryTree()
+    count = 0
     
     for url in urls:
-        parsed = urlparse(url)
-        path = unquote(parsed.path)
+        record = parse_url(url)
+        count += 1
+        if keep is not None and not keep(record):
+            continue
         
-        # Remove leading/trailing slashes and split
-        clean_path = path.strip('/')
-        parts = clean_path.split('/') if clean_path else []
+        if unique:
+            extension_groups[record.extension].add(url)
+        else:
+            extension_groups[record.extension].append(url)
+        dir_structure.add_path(record.path)
+        if on_record is not None:
+            on_record(record)
+    
+    return extension_groups, dir_structure, count
+
+class UrlIndex:
+    """
+    Persistent SQLite index of every URL, extension and directory seen in
+    previous crawls, keyed by host. Each row remembers the run that first
+    saw it, so the delta of the current run is a simple indexed query.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS runs (
+            id INTEGER PRIMARY KEY,
+            started REAL NOT NULL,
+            source TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS urls (
+            host TEXT NOT NULL,
+            url TEXT NOT NULL,
+            run INTEGER NOT NULL,
+            PRIMARY KEY (host, url)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS extensions (
+            host TEXT NOT NULL,
+            extension TEXT NOT NULL,
+            run INTEGER NOT NULL,
+            PRIMARY KEY (host, extension)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS directories (
+            host TEXT NOT NULL,
+            path TEXT NOT NULL,
+            run INTEGER NOT NULL,
+            PRIMARY KEY (host, path)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS urls_run ON urls (run);
+        CREATE INDEX IF NOT EXISTS extensions_run ON extensions (run);
+        CREATE INDEX IF NOT EXISTS directories_run ON directories (run);
+    """
+
+    def __init__(self, index_file, source):
+        self.conn = sqlite3.connect(index_file)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+        self.run = self.conn.execute(
+            "INSERT INTO runs (started, source) VALUES (?, ?)", (time.time(), source)
+        ).lastrowid
+        self.new_urls = 0
+        self.new_directories = 0
+        self.new_extensions = 0
+
+    @staticmethod
+    def row(record):
+        """The (host, url, extension, path) fields of a UrlRecord the index stores"""
+        return record.host, record.url, record.extension, record.path
+
+    def add(self, record):
+        """Merge one UrlRecord into the index"""
+        self.add_row(*self.row(record))
+
+    def add_row(self, host, url, extension, path):
+        """Merge one URL, given as the fields of UrlIndex.row, into the index"""
+        cursor = self.conn.execute(
+            "INSERT OR IGNORE INTO urls (host, url, run) VALUES (?, ?, ?)",
+            (host, url, self.run)
+        )
+        if not cursor.rowcount:
+            # A URL seen before brings no new extension or directory either
+            return
+        self.new_urls += 1
         
+        cursor = self.conn.execute(
+            "INSERT OR IGNORE INTO extensions (host, extension, run) VALUES (?, ?, ?)",
+            (host, extension, self.run)
+        )
+        self.new_extensions += cursor.rowcount
+        
+        dirs, _ = split_path(path)
         current_path = ""
-        for i, part in enumerate(parts):
-            if i == len(parts) - 1 and '.' in part:
-                # This is a file - add to current directory
-                dir_structure[current_path]['files'].add(part)
+        for name in dirs:
+            current_path += name + "/"
+            cursor = self.conn.execute(
+                "INSERT OR IGNORE INTO directories (host, path, run) VALUES (?, ?, ?)",
+                (host, current_path, self.run)
+            )
+            self.new_directories += cursor.rowcount
+
+    def commit(self):
+        """Commit the current run to disk"""
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def write_delta(self, output_file):
+        """Write everything first seen in the current run, grouped by host"""
+        sections = [
+            ("NEW URLS", "SELECT host, url FROM urls WHERE run = ? ORDER BY host, url"),
+            ("NEW DIRECTORIES", "SELECT host, path FROM directories WHERE run = ? ORDER BY host, path"),
+            ("NEW EXTENSIONS", "SELECT host, extension FROM extensions WHERE run = ? ORDER BY host, extension"),
+        ]
+        counts = [self.new_urls, self.new_directories, self.new_extensions]
+        
+        with open(output_file, 'w', encoding='utf-8') as f:
+            f.write("=" * 80 + "\n")
+            f.write("NEW SINCE LAST CRAWL\n")
+            f.write("=" * 80 + "\n\n")
+            
+            for (title, query), count in zip(sections, counts):
+                f.write(f"{title} ({count}):\n")
+                f.write("-" * 40 + "\n")
+                current_host = None
+                for host, value in self.conn.execute(query, (self.run,)):
+                    if host != current_host:
+                        f.write(f"[{host}]\n")
+                        current_host = host
+                    f.write(f"{value}\n")
+                f.write("\n" + "=" * 50 + "\n\n")
+            
+            f.write("END OF REPORT\n")
+            f.write("=" * 80 + "\n")
+
+def merge_results(results, unique=False, new_group=None, tagger=None, index=None):
+    """
+    Merge per-shard (extension_groups, dir_structure, count, tag_groups,
+    index_rows) results into one. Shard tag groups go into tagger and
+    shard index rows into index, so the parent never parses a URL again.
+    """
+    extension_groups = defaultdict(new_group or (set if unique else list))
+    dir_structure = DirectoryTree()
+    total = 0
+    
+    for shard_groups, shard_structure, count, tag_groups, index_rows in results:
+        for ext, urls in shard_groups.items():
+            if unique:
+                extension_groups[ext].update(urls)
             else:
-                # This is a directory - add to parent directory's subdirectories
-                if part:  # Skip empty directory names
-                    dir_structure[current_path]['dirs'].add(part)
-                    current_path = os.path.join(current_path, part).replace('\\', '/')
+                extension_groups[ext].extend(urls)
+        dir_structure.merge(shard_structure)
+        total += count
+        if tagger is not None:
+            tagger.merge(tag_groups)
+        if index is not None:
+            for row in index_rows:
+                index.add_row(*row)
     
-    return dir_structure
+    return extension_groups, dir_structure, total
 
-def read_urls(input_file):
-    """Read and clean URLs from input file"""
-    urls = []
+def shard_ranges(input_file, shards):
+    """Split a file into byte ranges that start and end on line boundaries"""
+    size = os.path.getsize(input_file)
+    if size == 0:
+        return []
+    
+    bounds = [0]
+    with open(input_file, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for i in range(1, shards):
+            target = max(size * i // shards, bounds[-1])
+            # Move the cut just past the next newline
+            newline = mm.find(b'\n', target)
+            cut = size if newline == -1 else newline + 1
+            if cut >= size:
+                break
+            if cut > bounds[-1]:
+                bounds.append(cut)
+    bounds.append(size)
+    
+    return list(zip(bounds, bounds[1:]))
+
+def _iter_shard_urls(input_file, start, end):
+    """Read and clean the URLs of one byte range, splitting lines like text mode does"""
+    with open(input_file, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        mm.seek(start)
+        while mm.tell() < end:
+            line = mm.readline()
+            # Universal newlines also break on a lone '\r'
+            for piece in (line.split(b'\r') if b'\r' in line else (line,)):
+                url = piece.decode('utf-8').strip()
+                if url and not url.startswith('#'):  # Skip empty lines and comments
+                    yield url
+
+def _organize_shard(task):
+    """
+    Process pool entry point: organize the URLs of one shard, tag them
+    with the worker's copy of tagger and collect their index rows
+    """
+    input_file, start, end, unique, tagger, with_index = task
+    index_rows = [] if with_index else None
+    
+    def on_record(record):
+        if tagger is not None:
+            tagger.add(record)
+        if index_rows is not None:
+            index_rows.append(UrlIndex.row(record))
+    
+    extension_groups, dir_structure, count = organize_urls(
+        _iter_shard_urls(input_file, start, end), unique,
+        on_record=on_record if tagger is not None or with_index else None
+    )
+    tag_groups = tagger.tag_groups if tagger is not None else None
+    return extension_groups, dir_structure, count, tag_groups, index_rows
+
+def organize_file_parallel(input_file, workers, unique=False, new_group=None, tagger=None, index=None):
+    """
+    Split input_file into one byte range per worker, organize the shards in a
+    process pool and merge them. Produces the same groups and tree as
+    organize_urls. With tagger and index, the workers tag the URLs and
+    prepare the index rows as they parse them, and the parent only merges
+    the tag groups and writes the rows.
+    """
+    tasks = [(input_file, start, end, unique, tagger, index is not None)
+             for start, end in shard_ranges(input_file, workers)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return merge_results(pool.map(_organize_shard, tasks), unique, new_group, tagger, index)
+
+def is_plain_file(input_file):
+    """Return True if input_file is an uncompressed regular file that can be sharded"""
+    if input_file == '-' or not os.path.isfile(input_file):
+        return False
+    with open(input_file, 'rb') as f:
+        magic = f.read(len(ZSTD_MAGIC))
+    return not (magic.startswith(GZIP_MAGIC) or magic.startswith(ZSTD_MAGIC))
+
+@contextlib.contextmanager
+def open_input(input_file):
+    """Open a plain, gzip or zstd compressed input file (or '-' for stdin) as text"""
+    with contextlib.ExitStack() as stack:
+        if input_file == '-':
+            raw = sys.stdin.buffer
+        else:
+            raw = stack.enter_context(open(input_file, 'rb'))
+        
+        magic = raw.peek(len(ZSTD_MAGIC))[:len(ZSTD_MAGIC)]
+        if magic.startswith(GZIP_MAGIC):
+            raw = stack.enter_context(gzip.GzipFile(fileobj=raw))
+        elif magic.startswith(ZSTD_MAGIC):
+            if zstandard is None:
+                raise RuntimeError("zstd input requires the 'zstandard' package (pip install zstandard)")
+            raw = stack.enter_context(zstandard.ZstdDecompressor().stream_reader(raw))
+        
+        text = io.TextIOWrapper(raw, encoding='utf-8')
+        try:
+            yield text
+        finally:
+            # Leave stdin and the compressed streams to the exit stack
+            text.detach()
+
+def iter_urls(input_file):
+    """Lazily read and clean URLs from input file"""
     try:
-        with open(input_file, 'r', encoding='utf-8') as f:
+        with open_input(input_file) as f:
             for line in f:
                 url = line.strip()
                 if url and not url.startswith('#'):  # Skip empty lines and comments
-                    urls.append(url)
+                    yield url
     except FileNotFoundError:
         print(f"Error: Input file '{input_file}' not found.")
         sys.exit(1)
     except Exception as e:
         print(f"Error reading input file: {e}")
         sys.exit(1)
-    
-    return urls
 
-def print_directory_tree(dir_structure, current_path="", prefix="", f=None):
-    """Recursively print directory tree structure"""
-    # Get directories and files for current path
-    dirs = sorted(dir_structure[current_path]['dirs'])
-    files = sorted(dir_structure[current_path]['files'])
-    
-    # Print directories
-    for i, dir_name in enumerate(dirs):
-        is_last_dir = (i == len(dirs) - 1) and (len(files) == 0)
-        connector = "└── " if is_last_dir else "├── "
-        
-        f.write(f"{prefix}{connector}{dir_name}/\n")
-        
-        # Determine prefix for next level
-        new_prefix = prefix + ("    " if is_last_dir else "│   ")
-        
-        # Build next path and recurse
-        next_path = os.path.join(current_path, dir_name).replace('\\', '/')
-        print_directory_tree(dir_structure, next_path, new_prefix, f)
-    
-    # Print files
-    for i, file_name in enumerate(files):
-        is_last = i == len(files) - 1
-        connector = "└── " if is_last else "├── "
-        f.write(f"{prefix}{connector}{file_name}\n")
+def read_urls(input_file):
+    """Read and clean URLs from input file"""
+    return list(iter_urls(input_file))
+
+def print_directory_tree(dir_structure, f):
+    """Write the directory tree structure to f"""
+    f.writelines(dir_structure.iter_lines())
 
-def write_output(output_file, extension_groups, dir_structure):
-    """Write organized results to output file"""
+def split_file_name(ext, used):
+    """Pick a unique, filesystem-safe file name for an extension group"""
+    base = re.sub(r'[^A-Za-z0-9_-]', '_', ext) or 'empty-extension'
+    name, n = base, 1
+    while name in used:
+        n += 1
+        name = f"{base}-{n}"
+    used.add(name)
+    return f"{name}.txt"
+
+def write_output(output_file, extension_groups, dir_structure, split_dir=None, tag_groups=None):
+    """
+    Write organized results to output file. With split_dir, every extension
+    group is also streamed to its own file in that directory. tag_groups,
+    if given, adds a section per wordlist tag.
+    """
     try:
-        with open(output_file, 'w', encoding='utf-8') as f:
+        if split_dir:
+            os.makedirs(split_dir, exist_ok=True)
+        used_names = set()
+        
+        with open(output_file, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as f:
             # Write header
             f.write("=" * 80 + "\n")
             f.write("URL ORGANIZER AND DIRECTORY MAP BUILDER\n")
@@ -125,10 +874,32 @@ def write_output(output_file, extension_groups, dir_structure):
                     f.write(f"{ext.upper()} FILES ({len(urls)} URLs):\n")
                 f.write("-" * 40 + "\n")
                 
-                for url in sorted(urls):
-                    f.write(f"{url}\n")
+                if split_dir:
+                    group_file = os.path.join(split_dir, split_file_name(ext, used_names))
+                    with open(group_file, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as split_f:
+                        for url in sorted_urls(urls):
+                            line = f"{url}\n"
+                            f.write(line)
+                            split_f.write(line)
+                else:
+                    f.writelines(f"{url}\n" for url in sorted_urls(urls))
                 f.write("\n" + "=" * 50 + "\n\n")
             
+            # Write tagged URLs
+            if tag_groups is not None:
+                f.write("URLS TAGGED BY WORDLIST MATCH\n")
+                f.write("=" * 50 + "\n\n")
+                
+                tagged_urls = len(set().union(*tag_groups.values())) if tag_groups else 0
+                f.write(f"Tagged URLs: {tagged_urls} ({len(tag_groups)} tags)\n\n")
+                
+                for tag, urls in sorted(tag_groups.items()):
+                    kind, _, name = tag.partition(':')
+                    f.write(f"{kind.upper()} {name} ({len(urls)} URLs):\n")
+                    f.write("-" * 40 + "\n")
+                    f.writelines(f"{url}\n" for url in sorted(urls))
+                    f.write("\n" + "=" * 50 + "\n\n")
+            
             # Write directory map
             f.write("DIRECTORY STRUCTURE MAP\n")
             f.write("=" * 50 + "\n\n")
@@ -136,7 +907,7 @@ def write_output(output_file, extension_groups, dir_structure):
             if dir_structure:
                 f.write("Directory Tree:\n")
                 f.write(".\n")
-                print_directory_tree(dir_structure, "", "", f)
+                print_directory_tree(dir_structure, f)
             else:
                 f.write("No directory structure could be extracted from the URLs.\n")
             
@@ -153,30 +924,132 @@ def main():
     args = parse_arguments()
     
     print(f"[+] Reading URLs from: {args.input}")
-    urls = read_urls(args.input)
-    print(f"[+] Found {len(urls)} URLs")
+    if args.workers < 1:
+        print("Error: --workers must be at least 1.")
+        sys.exit(1)
     
-    # Organize URLs by extension
-    print("[+] Organizing URLs by file extension...")
-    extension_groups = defaultdict(list)
-    for url in urls:
-        ext = extract_extension(url)
-        extension_groups[ext].append(url)
+    if args.new_output and not args.index:
+        print("Error: --new-output needs --index.")
+        sys.exit(1)
+    
+    index = None
+    if args.index:
+        try:
+            index = UrlIndex(args.index, os.path.abspath(args.input) if args.input != '-' else '-')
+        except sqlite3.Error as e:
+            print(f"Error opening index '{args.index}': {e}")
+            sys.exit(1)
+        print(f"[+] Merging crawl into index: {args.index}")
+    
+    tagger = None
+    if args.tag or args.tag_paths or args.tag_params:
+        path_wordlists = list(args.tag_paths or [])
+        param_wordlists = list(args.tag_params or [])
+        if args.tag:
+            path_wordlists.append(DEFAULT_PATH_WORDLIST)
+            param_wordlists.append(DEFAULT_PARAM_WORDLIST)
+        
+        tagger = UrlTagger()
+        try:
+            for wordlist in path_wordlists:
+                tagger.load_path_wordlist(wordlist)
+            for wordlist in param_wordlists:
+                tagger.load_param_wordlist(wordlist)
+        except OSError as e:
+            print(f"Error reading tag wordlist: {e}")
+            sys.exit(1)
+        tagger.build()
+        print(f"[+] Tagging URLs with {len(path_wordlists)} path and {len(param_wordlists)} parameter wordlists")
+    
+    consumers = [consumer for consumer in (index, tagger) if consumer is not None]
+    on_record = None
+    if consumers:
+        def on_record(record):
+            for consumer in consumers:
+                consumer.add(record)
+    
+    deduper = None
+    if args.dedup:
+        if args.exemplars < 1:
+            print("Error: --exemplars must be at least 1.")
+            sys.exit(1)
+        deduper = UrlDeduplicator(args.exemplars, args.bloom)
+    keep = deduper.admit if deduper is not None else None
+    
+    new_group = None
+    spill_dir = None
+    if args.sort_buffer is not None:
+        if args.sort_buffer < 1:
+            print("Error: --sort-buffer must be at least 1.")
+            sys.exit(1)
+        spill_dir = tempfile.TemporaryDirectory(prefix='katana_healper-', dir=args.tmp_dir)
+        new_group = lambda: SpillingGroup(args.sort_buffer, spill_dir.name, unique=args.stream)
+    
+    if args.workers > 1 and deduper is not None:
+        print("[!] --dedup keeps its templates in one process, falling back to a single process")
+        args.workers = 1
     
-    # Build directory structure
-    print("[+] Building directory structure map...")
-    dir_structure = build_directory_map(urls)
+    if args.workers > 1 and not is_plain_file(args.input):
+        print("[!] Sharding needs an uncompressed regular file, falling back to a single process")
+        args.workers = 1
+    
+    if args.workers > 1:
+        print(f"[+] Organizing URLs in {args.workers} worker processes...")
+        try:
+            extension_groups, dir_structure, total = organize_file_parallel(args.input, args.workers, args.stream,
+                                                                                new_group, tagger, index)
+        except Exception as e:
+            print(f"Error reading input file: {e}")
+            sys.exit(1)
+        print(f"[+] Found {total} URLs")
+    elif args.stream:
+        # Nothing but the unique URLs and the directory map is kept in memory
+        print("[+] Streaming URLs into extension groups and directory map...")
+        extension_groups, dir_structure, total = organize_urls(iter_urls(args.input), unique=True,
+                                                               on_record=on_record, keep=keep,
+                                                               new_group=new_group)
+        print(f"[+] Found {total} URLs")
+    else:
+        urls = read_urls(args.input)
+        print(f"[+] Found {len(urls)} URLs")
+        
+        # Organize URLs by extension and build directory structure from one parse
+        print("[+] Organizing URLs by file extension and building directory structure map...")
+        extension_groups, dir_structure, total = organize_urls(urls, on_record=on_record, keep=keep,
+                                                               new_group=new_group)
+        del urls
     
     # Write output
     print(f"[+] Writing results to: {args.output}")
-    write_output(args.output, extension_groups, dir_structure)
+    write_output(args.output, extension_groups, dir_structure, args.split_dir,
+                 tagger.tag_groups if tagger is not None else None)
+    
+    if index is not None:
+        index.commit()
+        if args.new_output:
+            print(f"[+] Writing new findings to: {args.new_output}")
+            try:
+                index.write_delta(args.new_output)
+            except Exception as e:
+                print(f"Error writing new findings file: {e}")
+                sys.exit(1)
+        index.close()
     
     # Print summary
     print("\n[+] Organization Complete!")
     print(f"    - Input file: {args.input}")
     print(f"    - Output file: {args.output}")
-    print(f"    - Total URLs processed: {len(urls)}")
+    print(f"    - Total URLs processed: {total}")
     print(f"    - File extension groups: {len(extension_groups)}")
+    if deduper is not None:
+        print(f"    - URLs kept after deduplication: {deduper.kept}")
+        print(f"    - URLs collapsed into templates: {deduper.dropped}")
+        if deduper.bloom is None:
+            print(f"    - Unique templates: {len(deduper.counts)}")
+    if index is not None:
+        print(f"    - New URLs: {index.new_urls}")
+        print(f"    - New directories: {index.new_directories}")
+        print(f"    - New extensions: {index.new_extensions}")
     
     print("\n[+] Extension Summary:")
     for ext, urls_list in sorted(extension_groups.items()):
@@ -184,6 +1057,15 @@ def main():
             print(f"    - URLs with no extension: {len(urls_list)}")
         else:
             print(f"    - {ext.upper()} files: {len(urls_list)}")
+    
+    if tagger is not None:
+        print("\n[+] Tag Summary (top 20):")
+        top_tags = sorted(tagger.tag_groups.items(), key=lambda item: (-len(item[1]), item[0]))[:20]
+        for tag, tagged in top_tags:
+            print(f"    - {tag}: {len(tagged)}")
+    
+    if spill_dir is not None:
+        spill_dir.cleanup()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
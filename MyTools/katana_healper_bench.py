@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+katana_healper Benchmark
+Generates seeded synthetic crawl output and times every katana_healper stage
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import sys
+import time
+import multiprocessing
+import queue as queue_module
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import katana_healper  # noqa: E402
+
+DEFAULT_SIZES = "10000,100000,1000000"
+
+HOSTS = ["www", "api", "static", "cdn", "admin", "m", "shop", "auth"]
+WORDS = [
+    "api", "v1", "v2", "v3", "users", "user", "admin", "static", "assets", "js", "css",
+    "img", "images", "uploads", "files", "docs", "blog", "posts", "news", "search",
+    "account", "settings", "profile", "orders", "cart", "checkout", "products", "catalog",
+    "category", "public", "private", "internal", "graphql", "rest", "wp-content",
+    "wp-includes", "themes", "plugins", "vendor", "node_modules", "dist", "build",
+    "en", "de", "fr", "help", "support", "login", "logout", "reset", "download",
+]
+ENCODED_WORDS = ["my%20files", "caf%C3%A9", "a%2Fb", "%7Euser", "100%25", "r%C3%A9sum%C3%A9"]
+EXTENSIONS = [
+    ("", 30), ("js", 20), ("php", 8), ("html", 8), ("css", 6), ("json", 5), ("png", 5),
+    ("jpg", 4), ("svg", 3), ("aspx", 2), ("jsp", 2), ("xml", 2), ("txt", 2), ("map", 1),
+    ("woff2", 1), ("pdf", 1),
+]
+PARAMS = ["id", "page", "q", "sort", "lang", "ref", "token", "utm_source", "callback", "v"]
+
+def generate_url(rng, domain):
+    """Generate one synthetic katana output line"""
+    host = f"{rng.choice(HOSTS)}.{domain}"
+
+    # Mostly shallow paths with a long tail of deep ones
+    depth = min(int(rng.expovariate(0.35)), 24)
+    segments = []
+    for _ in range(depth):
+        roll = rng.random()
+        if roll < 0.15:
+            segments.append(str(rng.randint(1, 100000)))
+        elif roll < 0.2:
+            segments.append(rng.choice(ENCODED_WORDS))
+        elif roll < 0.23:
+            segments.append(f"{rng.getrandbits(128):032x}")
+        else:
+            segments.append(rng.choice(WORDS))
+
+    names, weights = zip(*EXTENSIONS)
+    ext = rng.choices(names, weights)[0]
+    if ext:
+        segments.append(f"{rng.choice(WORDS)}-{rng.randint(0, 999)}.{ext}")
+
+    url = f"https://{host}/" + "/".join(segments)
+    if rng.random() < 0.3:
+        params = rng.sample(PARAMS, rng.randint(1, 4))
+        url += "?" + "&".join(f"{name}={rng.randint(0, 5000)}" for name in params)
+    return url
+
+def generate_corpus(path, count, seed, domain="example.com"):
+    """Write count synthetic URLs to path, deterministically for a given seed"""
+    rng = random.Random(seed)
+    with open(path, 'w', encoding='utf-8', buffering=1 << 20) as f:
+        for _ in range(count):
+            f.write(generate_url(rng, domain) + "\n")
+
+def peak_rss_kb():
+    """Peak resident set size of this process in KiB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+def memory_status():
+    """Current and peak (VmRSS, VmHWM) resident set size in KiB from /proc, or None off Linux"""
+    try:
+        with open('/proc/self/status', 'r') as f:
+            fields = dict(line.split(':', 1) for line in f if ':' in line)
+        return int(fields['VmRSS'].split()[0]), int(fields['VmHWM'].split()[0])
+    except (OSError, KeyError, ValueError):
+        return None
+
+def reset_peak_rss():
+    """Restart VmHWM from the current RSS (Linux 4.0+), True if it worked"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+def run_stages(corpus, report, queue):
+    """
+    Time every stage in a fresh process. Where /proc allows resetting the
+    high-water mark, each stage gets its own peak RSS and the RSS it left
+    allocated; elsewhere only the whole run's peak is reported.
+    """
+    stages = {}
+    per_stage = reset_peak_rss() and memory_status() is not None
+    before = memory_status() if per_stage else None
+
+    def record(name, start, count):
+        nonlocal before
+        elapsed = time.perf_counter() - start
+        stages[name] = {
+            "seconds": round(elapsed, 4),
+            "urls_per_sec": round(count / elapsed, 1) if elapsed else None,
+        }
+        if per_stage:
+            current, peak = memory_status()
+            stages[name]["stage_peak_rss_kb"] = peak
+            stages[name]["rss_change_kb"] = current - before[0]
+            reset_peak_rss()
+            before = memory_status()
+
+    start = time.perf_counter()
+    urls = katana_healper.read_urls(corpus)
+    record("read_urls", start, len(urls))
+
+    start = time.perf_counter()
+    extension_groups = defaultdict(list)
+    for url in urls:
+        extension_groups[katana_healper.extract_extension(url)].append(url)
+    record("extract_extension", start, len(urls))
+
+    start = time.perf_counter()
+    dir_structure = katana_healper.build_directory_map(urls)
+    record("build_directory_map", start, len(urls))
+
+    start = time.perf_counter()
+    katana_healper.write_output(report, extension_groups, dir_structure)
+    record("write_output", start, len(urls))
+
+    # Resetting VmHWM also resets ru_maxrss, so the run's peak is the highest stage peak then
+    peak = max(stage["stage_peak_rss_kb"] for stage in stages.values()) if per_stage else peak_rss_kb()
+    queue.put({"stages": stages, "peak_rss_kb": peak})
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark katana_healper on synthetic crawl output')
+    parser.add_argument('--sizes', default=DEFAULT_SIZES,
+                        help=f'Comma separated corpus sizes in URLs (default: {DEFAULT_SIZES})')
+    parser.add_argument('--seed', type=int, default=1337, help='Generator seed (default: 1337)')
+    parser.add_argument('--workdir', default='katana_bench',
+                        help='Directory for generated corpora and reports (default: katana_bench)')
+    parser.add_argument('--label', default='', help='Free-form label stored in the results, e.g. a git revision')
+    parser.add_argument('-o', '--output', default='katana_bench.json', help='JSON results file')
+    args = parser.parse_args()
+
+    try:
+        sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+    except ValueError:
+        parser.error("--sizes must be a comma separated list of integers")
+
+    os.makedirs(args.workdir, exist_ok=True)
+    context = multiprocessing.get_context('spawn')
+    results = []
+
+    for size in sizes:
+        corpus = os.path.join(args.workdir, f"corpus-{args.seed}-{size}.txt")
+        if not os.path.exists(corpus):
+            print(f"[+] Generating {size} URLs -> {corpus}")
+            generate_corpus(corpus, size, args.seed)
+        report = os.path.join(args.workdir, f"report-{size}.txt")
+
+        print(f"[+] Benchmarking {size} URLs...")
+        queue = context.Queue()
+        process = context.Process(target=run_stages, args=(corpus, report, queue))
+        process.start()
+        run = None
+        while run is None:
+            try:
+                run = queue.get(timeout=1)
+            except queue_module.Empty:
+                if not process.is_alive():
+                    print(f"Error: benchmark process for {size} URLs exited with code {process.exitcode}")
+                    sys.exit(1)
+        process.join()
+
+        results.append({
+            "urls": size,
+            "input_bytes": os.path.getsize(corpus),
+            "peak_rss_kb": run["peak_rss_kb"],
+            "stages": run["stages"],
+        })
+        for name, stage in run["stages"].items():
+            memory = ""
+            if "stage_peak_rss_kb" in stage:
+                memory = (f"  stage peak RSS {stage['stage_peak_rss_kb'] / 1024:,.1f} MiB"
+                          f" ({stage['rss_change_kb'] / 1024:+,.1f} MiB kept)")
+            print(f"    - {name.ljust(20)} {stage['seconds']:>9.3f}s "
+                  f"{stage['urls_per_sec']:>12,.0f} URLs/s{memory}")
+        print(f"    - whole run peak RSS {run['peak_rss_kb'] / 1024:,.1f} MiB")
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump({
+            "label": args.label,
+            "seed": args.seed,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime('%Y-%m-%dT%H:%M:%S'),
+            "results": results,
+        }, f, indent=2)
+    print(f"\n[+] Results written to: {args.output}")
+
+if __name__ == "__main__":
+    main()
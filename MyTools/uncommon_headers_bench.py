@@ -0,0 +1,436 @@
+#!/usr/bin/env python3
+"""
+uncommon_headers_test Benchmark
+Runs the full header sweep against a local mock target and reports throughput, latency and memory
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import resource
+import ssl
+import subprocess
+import sys
+import time
+import warnings
+import multiprocessing
+import queue as queue_module
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import uncommon_headers_test  # noqa: E402
+
+try:
+    import h2.config
+    import h2.connection
+    import h2.events
+    import h2.exceptions
+except ImportError:  # Only needed to serve HTTP/2
+    h2 = None
+
+DEFAULT_CONCURRENCY = "1,10,50,100"
+DEFAULT_WORDLIST = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'wordlist', 'uncommon_header.txt')
+DEFAULT_REFLECT = "X-Forwarded-Host,X-Original-Url"
+DEFAULT_ERROR_HEADERS = "X-Debug-Test"
+
+def make_filler(size):
+    """
+    Page text of size bytes. Like a real page its words change along the
+    way (header, articles, footer), so a prefix does not look like the whole
+    """
+    rng = random.Random(size)
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    paragraphs = []
+    length = 0
+    while length < size:
+        vocabulary = [''.join(rng.choices(letters, k=rng.randint(3, 9))) for _ in range(20)]
+        paragraph = f"<p>{' '.join(rng.choices(vocabulary, k=60))}</p>\n"
+        paragraphs.append(paragraph)
+        length += len(paragraph)
+    return ''.join(paragraphs).encode('ascii')[:size]
+
+class MockTarget:
+    """How the stand-in server answers: think time, body size, rate limit, reflected and error headers"""
+
+    def __init__(self, latency=10.0, jitter=2.0, body_size=2048, rate_limit=0.0, reflect=(), error_headers=(),
+                 reflect_at='end'):
+        self.latency = latency / 1000
+        self.jitter = jitter / 1000
+        self.filler = make_filler(body_size)
+        self.rate_limit = rate_limit
+        self.tokens = rate_limit
+        self.refilled = time.monotonic()
+        self.reflect_all = '*' in reflect
+        self.reflect = {name.lower() for name in reflect}
+        self.error_headers = {name.lower() for name in error_headers}
+        self.reflect_at = reflect_at
+
+    def allow(self):
+        """Token bucket shared by all connections, a burst of at most one second"""
+        if not self.rate_limit:
+            return True
+        now = time.monotonic()
+        self.tokens = min(self.rate_limit, self.tokens + (now - self.refilled) * self.rate_limit)
+        self.refilled = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    async def respond(self, headers):
+        """Return (status, extra headers, body) for a request with the given (name, value) headers"""
+        if not self.allow():
+            return 429, [('retry-after', '1')], b"slow down\n"
+
+        await asyncio.sleep(max(0.0, random.uniform(self.latency - self.jitter, self.latency + self.jitter)))
+        status = 200
+        reflected = []
+        for name, value in headers:
+            name = name.lower()
+            if name in self.error_headers:
+                status = 500
+            if self.reflect_all or name in self.reflect:
+                reflected.append(value.encode('utf-8', 'replace'))
+        if self.reflect_at == 'start':
+            # Like a reflected Host in <title>, before the rest of the page
+            return status, [('content-type', 'text/html')], b"<title>" + b" ".join(reflected) + b"</title>\n" + self.filler
+        return status, [('content-type', 'text/html')], self.filler + b"\n".join(reflected)
+
+async def handle_http1(target, reader, writer):
+    """Serve keep-alive HTTP/1.1 requests on one connection"""
+    try:
+        while True:
+            head = await reader.readuntil(b"\r\n\r\n")
+            lines = head.decode('latin-1').split("\r\n")
+            headers = [tuple(part.strip() for part in line.split(':', 1)) for line in lines[1:] if ':' in line]
+            fields = {name.lower(): value for name, value in headers}
+            try:
+                length = int(fields.get('content-length', 0))
+            except ValueError:
+                length = 0
+            if length > 0:
+                await reader.readexactly(length)
+
+            status, extra, body = await target.respond(headers)
+            response = [f"HTTP/1.1 {status} {'OK' if status == 200 else 'Mock'}", f"Content-Length: {len(body)}"]
+            response.extend(f"{name}: {value}" for name, value in extra)
+            writer.write(("\r\n".join(response) + "\r\n\r\n").encode('latin-1') + body)
+            await writer.drain()
+            if fields.get('connection', '').lower() == 'close':
+                break
+    except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+async def handle_http2(target, reader, writer):
+    """Serve HTTP/2 streams on one connection, answering each stream concurrently"""
+    conn = h2.connection.H2Connection(h2.config.H2Configuration(client_side=False, header_encoding='utf-8'))
+    conn.initiate_connection()
+    writer.write(conn.data_to_send())
+    window = asyncio.Condition()
+    requests = {}
+    tasks = set()
+
+    async def respond(stream_id, headers):
+        status, extra, body = await target.respond([(name, value) for name, value in headers if not name.startswith(':')])
+        try:
+            conn.send_headers(stream_id, [(':status', str(status)), ('content-length', str(len(body)))] + extra)
+            offset = 0
+            while True:
+                size = min(conn.local_flow_control_window(stream_id), conn.max_outbound_frame_size, len(body) - offset)
+                if size <= 0 and offset < len(body):
+                    writer.write(conn.data_to_send())
+                    async with window:
+                        await window.wait()
+                    continue
+                conn.send_data(stream_id, body[offset:offset + size], end_stream=offset + size == len(body))
+                offset += size
+                writer.write(conn.data_to_send())
+                if offset == len(body):
+                    break
+        except (h2.exceptions.StreamClosedError, h2.exceptions.ProtocolError):
+            pass  # The client stopped reading (e.g. at its byte cap)
+
+    try:
+        while True:
+            data = await reader.read(65536)
+            if not data:
+                break
+            for event in conn.receive_data(data):
+                if isinstance(event, h2.events.RequestReceived):
+                    requests[event.stream_id] = event.headers
+                elif isinstance(event, h2.events.DataReceived):
+                    conn.acknowledge_received_data(event.flow_controlled_length, event.stream_id)
+                elif isinstance(event, h2.events.StreamEnded):
+                    task = asyncio.ensure_future(respond(event.stream_id, requests.pop(event.stream_id, [])))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                elif isinstance(event, h2.events.WindowUpdated):
+                    async with window:
+                        window.notify_all()
+                elif isinstance(event, h2.events.ConnectionTerminated):
+                    return
+            writer.write(conn.data_to_send())
+            await writer.drain()
+    except (h2.exceptions.ProtocolError, ConnectionError):
+        pass
+    finally:
+        for task in tasks:
+            task.cancel()
+        writer.close()
+
+async def serve(target, port, certfile=None, keyfile=None, ready=None):
+    """Run the mock server until cancelled, HTTP/2 is offered over TLS (ALPN) when h2 is installed"""
+    context = None
+    if certfile:
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(certfile, keyfile)
+        context.set_alpn_protocols(['h2', 'http/1.1'] if h2 is not None else ['http/1.1'])
+
+    async def handle(reader, writer):
+        ssl_object = writer.get_extra_info('ssl_object')
+        if ssl_object is not None and ssl_object.selected_alpn_protocol() == 'h2':
+            await handle_http2(target, reader, writer)
+        else:
+            await handle_http1(target, reader, writer)
+
+    server = await asyncio.start_server(handle, '127.0.0.1', port, ssl=context, backlog=1024)
+    if ready is not None:
+        ready.put(server.sockets[0].getsockname()[1])
+    async with server:
+        await server.serve_forever()
+
+def run_server(options, certfile, keyfile, ready):
+    """Entry point of the server process"""
+    try:
+        asyncio.run(serve(MockTarget(**options), 0, certfile, keyfile, ready))
+    except KeyboardInterrupt:
+        pass
+
+def make_certificate(workdir):
+    """Create a throwaway self-signed certificate with openssl, return (certfile, keyfile) or None"""
+    certfile = os.path.join(workdir, 'mock-cert.pem')
+    keyfile = os.path.join(workdir, 'mock-key.pem')
+    if os.path.exists(certfile) and os.path.exists(keyfile):
+        return certfile, keyfile
+    try:
+        subprocess.run(
+            ['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '2',
+             '-subj', '/CN=localhost', '-keyout', keyfile, '-out', certfile],
+            check=True, capture_output=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return certfile, keyfile
+
+def peak_rss_kb():
+    """Peak resident set size of this process in KiB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+def run_sweep(config, queue):
+    """Run one full header sweep in a fresh process so peak RSS belongs to this run only"""
+    warnings.filterwarnings('ignore', message='Unverified HTTPS request')  # The mock certificate is self-signed
+    tester = uncommon_headers_test
+    tester.ENGINE = config['engine']
+    tester.CONCURRENCY = config['concurrency']
+    tester.ENABLE_HTTP2 = config['protocol'] == 'h2'
+    tester.ADAPTIVE_RATE_CONTROL = config['adaptive']
+    tester.STREAM_RESPONSES = config['stream']
+    headers_to_test = tester.load_headers(config['wordlist'])
+    request_details = {
+        'method': 'get',
+        'url': config['url'],
+        'original_headers': {"User-Agent": "header-bench", "Accept": "*/*"},
+        'cookies': {},
+        'data': None,
+    }
+
+    latencies = []
+    statuses = {}
+    reflected = 0
+    reflected_changed = []
+
+    def on_response(i, header_name, response, baseline):
+        nonlocal reflected
+        if response is None:
+            statuses['FAILED'] = statuses.get('FAILED', 0) + 1
+            return
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        timings = getattr(response, 'timings', None) or {}
+        if timings.get('total') is not None:
+            latencies.append(timings['total'])
+        is_reflected = tester.is_value_reflected(response, header_name, tester.HEADER_VALUE)
+        reflected += is_reflected
+        # The mock only ever reflects a header, it must not be scored as changing the page too
+        if is_reflected and baseline is not None and response.status_code == 200:
+            score, reasons = baseline.score(tester.Fingerprint.from_response(response))
+            if score >= tester.ANOMALY_THRESHOLD:
+                reflected_changed.append(f"{header_name} ({', '.join(reasons)})")
+
+    start = time.perf_counter()
+    if config['engine'] == 'async':
+        asyncio.run(tester.run_async(request_details, headers_to_test, on_response))
+    else:
+        tester.run_sync(request_details, headers_to_test, on_response)
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    queue.put({
+        "probes": len(headers_to_test),
+        "seconds": round(elapsed, 4),
+        "requests_per_sec": round((len(headers_to_test) + tester.BASELINE_SAMPLES) / elapsed, 1),
+        "p50_ms": round(tester.percentile(latencies, 50) * 1000, 2) if latencies else None,
+        "p99_ms": round(tester.percentile(latencies, 99) * 1000, 2) if latencies else None,
+        "peak_rss_kb": peak_rss_kb(),
+        "statuses": {str(code): count for code, count in statuses.items()},
+        "reflected": reflected,
+        "reflected_changed": reflected_changed,
+    })
+
+def wait_for(queue, process, what):
+    """Get the result a child process puts on queue, exit if it dies first"""
+    while True:
+        try:
+            return queue.get(timeout=1)
+        except queue_module.Empty:
+            if not process.is_alive():
+                print(f"Error: {what} process exited with code {process.exitcode}")
+                sys.exit(1)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark uncommon_headers_test against a local mock target')
+    parser.add_argument('--concurrency', default=DEFAULT_CONCURRENCY,
+                        help=f'Comma separated concurrency levels for the async engine (default: {DEFAULT_CONCURRENCY})')
+    parser.add_argument('--engines', default='async,sync', help='Comma separated engines to run (default: async,sync)')
+    parser.add_argument('--protocols', default='http1,h2',
+                        help='Comma separated protocols to run, h2 needs h2 and openssl (default: http1,h2)')
+    parser.add_argument('-w', '--wordlist', default=DEFAULT_WORDLIST, help='Header wordlist to sweep')
+    parser.add_argument('--latency', type=float, default=10.0, help='Mock server think time in ms (default: 10)')
+    parser.add_argument('--jitter', type=float, default=2.0, help='Random +/- ms added to the think time (default: 2)')
+    parser.add_argument('--body-size', type=int, default=2048, help='Mock response body size in bytes (default: 2048)')
+    parser.add_argument('--rate-limit', type=float, default=0.0,
+                        help='Requests/sec the mock server allows before answering 429 (default: unlimited)')
+    parser.add_argument('--reflect', default=DEFAULT_REFLECT,
+                        help=f'Comma separated headers the mock server reflects, * for all (default: {DEFAULT_REFLECT})')
+    parser.add_argument('--reflect-at', choices=('start', 'end'), default='end',
+                        help='Put reflected values at the start (in <title>) or the end of the body (default: end)')
+    parser.add_argument('--error-headers', default=DEFAULT_ERROR_HEADERS,
+                        help=f'Comma separated headers that make the mock server answer 500 (default: {DEFAULT_ERROR_HEADERS})')
+    parser.add_argument('--adaptive', action='store_true', help='Keep adaptive rate control on (off to measure the engine itself)')
+    parser.add_argument('--no-stream', action='store_true', help='Download whole bodies instead of streaming them')
+    parser.add_argument('--serve', type=int, metavar='PORT',
+                        help='Only run the mock server (plain HTTP/1.1) on PORT until interrupted')
+    parser.add_argument('--workdir', default='header_bench',
+                        help='Directory for the mock certificate (default: header_bench)')
+    parser.add_argument('--label', default='', help='Free-form label stored in the results, e.g. a git revision')
+    parser.add_argument('-o', '--output', default='header_bench.json', help='JSON results file')
+    args = parser.parse_args()
+
+    options = {
+        'latency': args.latency,
+        'jitter': args.jitter,
+        'body_size': args.body_size,
+        'rate_limit': args.rate_limit,
+        'reflect': [name.strip() for name in args.reflect.split(',') if name.strip()],
+        'error_headers': [name.strip() for name in args.error_headers.split(',') if name.strip()],
+        'reflect_at': args.reflect_at,
+    }
+
+    if args.serve is not None:
+        print(f"[+] Mock target listening on http://127.0.0.1:{args.serve}/")
+        try:
+            asyncio.run(serve(MockTarget(**options), args.serve))
+        except KeyboardInterrupt:
+            pass
+        return
+
+    try:
+        levels = [int(level) for level in args.concurrency.split(',') if level.strip()]
+    except ValueError:
+        parser.error("--concurrency must be a comma separated list of integers")
+    engines = [engine.strip() for engine in args.engines.split(',') if engine.strip()]
+    protocols = [protocol.strip() for protocol in args.protocols.split(',') if protocol.strip()]
+    if not os.path.exists(args.wordlist):
+        print(f"Error: Wordlist not found at {args.wordlist}")
+        sys.exit(1)
+
+    os.makedirs(args.workdir, exist_ok=True)
+    context = multiprocessing.get_context('spawn')
+    results = []
+    failed = False
+
+    for protocol in protocols:
+        certfile = keyfile = None
+        if protocol == 'h2':
+            certificate = make_certificate(args.workdir) if h2 is not None else None
+            if certificate is None:
+                print("[-] Skipping h2: needs the h2 package and the openssl command")
+                continue
+            certfile, keyfile = certificate
+
+        # The server gets its own process, so it never competes with the engine for the GIL
+        ready = context.Queue()
+        server = context.Process(target=run_server, args=(options, certfile, keyfile, ready), daemon=True)
+        server.start()
+        port = wait_for(ready, server, "mock server")
+        url = f"{'https' if certfile else 'http'}://127.0.0.1:{port}/probe?id=1"
+        print(f"[+] Mock target ({protocol}) on {url}")
+
+        runs = []
+        for engine in engines:
+            if engine == 'sync':
+                runs.append(('sync', 1))  # One request at a time whatever the level
+            else:
+                runs.extend((engine, level) for level in levels)
+
+        for engine, level in runs:
+            config = {
+                'engine': engine,
+                'concurrency': level,
+                'protocol': protocol,
+                'adaptive': args.adaptive,
+                'stream': not args.no_stream,
+                'wordlist': args.wordlist,
+                'url': url,
+            }
+            print(f"[+] Sweeping with engine={engine} concurrency={level}...")
+            queue = context.Queue()
+            process = context.Process(target=run_sweep, args=(config, queue))
+            process.start()
+            run = wait_for(queue, process, "benchmark")
+            process.join()
+
+            results.append({"engine": engine, "protocol": protocol, "concurrency": level, **run})
+            print(f"    - {run['seconds']:>8.3f}s {run['requests_per_sec']:>9,.1f} req/s  "
+                  f"p50 {run['p50_ms']} ms  p99 {run['p99_ms']} ms  "
+                  f"peak RSS {run['peak_rss_kb'] / 1024:,.1f} MiB  reflected {run['reflected']}  "
+                  f"statuses {run['statuses']}")
+            if run['reflected_changed']:
+                print(f"    [!] Reflected-only headers reported as changed: {', '.join(run['reflected_changed'])}")
+                failed = True
+
+        server.terminate()
+        server.join()
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump({
+            "label": args.label,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime('%Y-%m-%dT%H:%M:%S'),
+            "mock_target": options,
+            "adaptive": args.adaptive,
+            "stream": not args.no_stream,
+            "results": results,
+        }, f, indent=2)
+    print(f"\n[+] Results written to: {args.output}")
+    if failed:
+        print("Error: Some reflected-only headers were scored as changing the response")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
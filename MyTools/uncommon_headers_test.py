@@ -1,251 +1,1614 @@
-import requests
-import re
-from urllib.parse import urlparse, urlunparse, urlencode, parse_qs
-
-# Configuration - Set these variables before running
-HEADERS_FILE_PATH = "/home/kali/wordlist/uncommon_header.txt"  # Path to your headers file
-HEADER_VALUE = "sadek"  # Value to assign to each header
-REQUEST_TIMEOUT = 10  # Timeout in seconds for each request
-ENABLE_CACHE_BUSTER = True  # Set to True to add cache-busting parameter to URLs
-
-request_code = """
-import httpx
-
-client = httpx.Client(http2=True)
-request_url = "https://thankyou.cablex.ch:8443/modules/grafana/service/api/access-control/roles"
-request_headers = {"User-Agent": "Mozilla/5.0 (X11; Linux x86_64; rv:128.0) Gecko/20100101 Firefox/128.0", "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8", "Accept-Language": "en-US,en;q=0.5", "Accept-Encoding": "gzip, deflate, br", "X-Api-Key": "a+X25PH05Pz9/fTk/Or05Pf16vX26v39/f3k9A==", "Content-Type": "application/json", "Upgrade-Insecure-Requests": "1", "Sec-Fetch-Dest": "document", "Sec-Fetch-Mode": "navigate", "Sec-Fetch-Site": "none", "Sec-Fetch-User": "?1", "Priority": "u=0, i", "Te": "trailers"}
-response = client.get(request_url, headers=request_headers)
-"""
-
-# ==============================================
-# DO NOT EDIT BELOW THIS LINE UNLESS NECESSARY
-# ==============================================
-
-def add_cache_buster(url, counter):
-    """Add cache-busting parameter to URL if ENABLE_CACHE_BUSTER is True"""
-    if not ENABLE_CACHE_BUSTER:
-        return url
-    
-    parsed = urlparse(url)
-    query = parse_qs(parsed.query)
-    query['test'] = [str(counter)]
-    
-    new_query = urlencode(query, doseq=True)
-    return urlunparse(parsed._replace(query=new_query))
-
-def extract_request_details(request_code):
-    """Extract URL, headers, and other request details from the httpx-generated Python code"""
-    try:
-        # Extract URL
-        url_match = re.search(r"request_url\s*=\s*[\"']([^\"']+)[\"']", request_code)
-        if not url_match:
-            raise ValueError("Could not find URL in request code")
-        
-        url = url_match.group(1)
-        
-        # Extract method (from the client call)
-        method_match = re.search(r"client\.(get|post|put|delete|patch|head|options)\(", request_code, re.IGNORECASE)
-        method = method_match.group(1).lower() if method_match else 'get'
-        
-        # Extract headers
-        headers_match = re.search(r"request_headers\s*=\s*\{([^}]+)\}", request_code, re.DOTALL)
-        original_headers = {}
-        if headers_match:
-            headers_str = headers_match.group(1)
-            # Simple parsing of headers dictionary (won't handle all edge cases)
-            for line in headers_str.split('\n'):
-                line = line.strip()
-                if not line or ':' not in line:
-                    continue
-                key, value = line.split(':', 1)
-                key = key.strip().strip('\'"')
-                value = value.strip().strip(',\'"')
-                original_headers[key] = value
-        
-        # Extract cookies
-        cookies_match = re.search(r"request_cookies\s*=\s*\{([^}]+)\}", request_code, re.DOTALL)
-        cookies = {}
-        if cookies_match:
-            cookies_str = cookies_match.group(1)
-            for line in cookies_str.split('\n'):
-                line = line.strip()
-                if not line or ':' not in line:
-                    continue
-                key, value = line.split(':', 1)
-                key = key.strip().strip('\'"')
-                value = value.strip().strip(',\'"')
-                cookies[key] = value
-        
-        # Extract data if it's a POST/PUT/PATCH request
-        data = None
-        data_match = re.search(r"data\s*=\s*\{([^}]+)\}", request_code, re.DOTALL)
-        if data_match:
-            data_str = data_match.group(1)
-            data = {}
-            for line in data_str.split('\n'):
-                line = line.strip()
-                if not line or ':' not in line:
-                    continue
-                key, value = line.split(':', 1)
-                key = key.strip().strip('\'"')
-                value = value.strip().strip(',\'"')
-                data[key] = value
-        
-        return {
-            'method': method,
-            'url': url,
-            'original_headers': original_headers,
-            'cookies': cookies,
-            'data': data
-        }
-    except Exception as e:
-        print(f"Error parsing request code: {e}")
-        return None
-
-def load_headers(file_path):
-    """Load headers from file, one per line"""
-    with open(file_path, 'r') as f:
-        return [line.strip() for line in f if line.strip() and not line.startswith('#')]
-
-def is_value_reflected(response, header_name, test_value):
-    """Check if the test value is reflected in the response"""
-    try:
-        # Check response headers
-        for resp_header_name, resp_header_value in response.headers.items():
-            if test_value.lower() in resp_header_value.lower():
-                return True
-        
-        # Check response body
-        if test_value.lower() in response.text.lower():
-            return True
-            
-        return False
-    except:
-        return False
-
-def send_request(method, url, headers, cookies=None, data=None):
-    """Send HTTP request with error handling"""
-    try:
-        if method == 'get':
-            return requests.get(url, headers=headers, cookies=cookies, timeout=REQUEST_TIMEOUT,verify=False)
-        elif method == 'post':
-            return requests.post(url, headers=headers, cookies=cookies, data=data, timeout=REQUEST_TIMEOUT,verify=False)
-        elif method == 'put':
-            return requests.put(url, headers=headers, cookies=cookies, data=data, timeout=REQUEST_TIMEOUT,verify=False)
-        elif method == 'delete':
-            return requests.delete(url, headers=headers, cookies=cookies, timeout=REQUEST_TIMEOUT,verify=False)
-        elif method == 'patch':
-            return requests.patch(url, headers=headers, cookies=cookies, data=data, timeout=REQUEST_TIMEOUT,verify=False)
-        elif method == 'head':
-            return requests.head(url, headers=headers, cookies=cookies, timeout=REQUEST_TIMEOUT,verify=False)
-        elif method == 'options':
-            return requests.options(url, headers=headers, cookies=cookies, timeout=REQUEST_TIMEOUT,verify=False)
-        else:
-            raise ValueError(f"Unsupported HTTP method: {method}")
-    except requests.exceptions.RequestException as e:
-        print(f"Request failed: {e}")
-        return None
-
-def main():
-    # Read the request code from the variable above
-    
-    # Extract request details
-    request_details = extract_request_details(request_code)
-    if not request_details:
-        print("Failed to parse request code. Please check the format.")
-        return
-    
-    print(f"\nTarget URL: {request_details['url']}")
-    print(f"Original Method: {request_details['method'].upper()}")
-    print(f"Original Headers: {len(request_details['original_headers'])} headers")
-    print(f"Original Cookies: {len(request_details['cookies'])} cookies")
-    if request_details['data']:
-        print(f"Request Data: {request_details['data']}")
-    print(f"Testing with header value: '{HEADER_VALUE}'")
-    print(f"Cache buster: {'ENABLED' if ENABLE_CACHE_BUSTER else 'DISABLED'}")
-    print("="*80)
-    
-    # Load headers to test
-    try:
-        headers_to_test = load_headers(HEADERS_FILE_PATH)
-    except FileNotFoundError:
-        print(f"Error: Headers file not found at {HEADERS_FILE_PATH}")
-        return
-    
-    print(f"Loaded {len(headers_to_test)} headers to test\n")
-    
-    # Test each header
-    results = []
-    reflected_headers = []
-    status_codes = {}
-    
-    for i, header_name in enumerate(headers_to_test, 1):
-        # Prepare headers - keep original ones and add our test header
-        test_headers = request_details['original_headers'].copy()
-        test_headers[header_name] = HEADER_VALUE
-        
-        # Add cache buster if enabled
-        request_url = add_cache_buster(request_details['url'], i)
-        
-        # Send request
-        print(f"Testing header {i}/{len(headers_to_test)}: {header_name}")
-        response = send_request(
-            request_details['method'],
-            request_url,
-            test_headers,
-            request_details['cookies'],
-            request_details['data']
-        )
-        
-        if response is None:
-            print("  -> Request failed\n")
-            results.append((header_name, "FAILED", 0, False))
-            continue
-        
-        # Check if value is reflected
-        reflected = is_value_reflected(response, header_name, HEADER_VALUE)
-        
-        # Record status code
-        status_code = response.status_code
-        status_codes[status_code] = status_codes.get(status_code, 0) + 1
-        
-        # Record reflected headers
-        if reflected:
-            reflected_headers.append(header_name)
-        
-        # Store results
-        results.append((
-            header_name,
-            status_code,
-            len(response.content),
-            reflected
-        ))
-        
-        # Print current result
-        print(f"  -> Status: {status_code}, Length: {len(response.content)}, Reflected: {reflected}\n")
-    
-    # Print summary
-    print("\n" + "="*80)
-    print("TESTING COMPLETE - SUMMARY")
-    print("="*80)
-    
-    
-    # Print detailed results
-    print("\nDetailed Results:")
-    print("-"*80)
-    print("Header".ljust(30) + "Status".ljust(10) + "Length".ljust(10) + "Reflected")
-    print("-"*80)
-    for header, status, length, reflected in results:
-        print(f"{header[:28].ljust(30)}{str(status).ljust(10)}{str(length).ljust(10)}{reflected}")
-    # Print status code summary
-    print("\nStatus Codes Received:")
-    for code, count in sorted(status_codes.items()):
-        print(f"  {code}: {count} requests")
-    
-    # Print reflected headers
-    print(f"\nHeaders with reflected values ({len(reflected_headers)}):")
-    for header in reflected_headers:
-        print(f"  {header}")
-
-if __name__ == "__main__":
+import argparse
+import asyncio
+import csv
+import functools
+import importlib.util
+import itertools
+import json
+import math
+import random
+import requests
+import re
+import time
+import zlib
+from collections import Counter, deque
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse, urlunparse, urlencode, parse_qs
+
+try:
+    import httpx
+except ImportError:  # Only needed for the async engine
+    httpx = None
+
+try:
+    import wordlist_pack
+except ImportError:  # Only needed to read compiled wordlist packs
+    wordlist_pack = None
+
+# Configuration - Set these variables before running
+HEADERS_FILE_PATH = "/home/kali/wordlist/uncommon_header.txt"  # Path to your headers file (text or wordlist_pack.py pack)
+HEADERS_TIER = None  # Tier of a headers pack to test ("small", "medium"), None for all of it
+HEADER_VALUE = "sadek"  # Value to assign to each header
+REQUEST_TIMEOUT = 10  # Timeout in seconds for each request
+STREAM_RESPONSES = True  # Read bodies in chunks and stop at MAX_RESPONSE_BYTES (or at the first reflection) instead of downloading them whole
+MAX_RESPONSE_BYTES = 256 * 1024  # Body bytes read and kept per response when streaming
+ENABLE_CACHE_BUSTER = True  # Set to True to add cache-busting parameter to URLs
+ENGINE = "async"  # "async" (httpx, concurrent, pooled) or "sync" (requests, one request at a time)
+CONCURRENCY = 20  # Maximum requests in flight with the async engine
+ENABLE_HTTP2 = True  # Use HTTP/2 with the async engine when the 'h2' package is installed
+ADAPTIVE_RATE_CONTROL = True  # Let the async engine find the highest rate each host tolerates
+INITIAL_RATE = 20.0  # Requests per second per host to start from (adaptive mode)
+MAX_RATE = 500.0  # Upper bound for the per-host request rate (adaptive mode)
+MAX_RETRIES = 3  # Retries for throttled responses and transient network errors
+PER_HOST_CONCURRENCY = 4  # Maximum requests in flight per host when scanning several targets
+MAX_ACTIVE_HOSTS = 64  # Hosts scanned at the same time (each with its own connection pool)
+RESULTS_FILE_PATH = "header_results.jsonl"  # JSONL results of a multi-target scan
+JOURNAL_FILE_PATH = "header_scan.journal"  # Append-only log of finished probes, read back by --resume
+METRICS_FILE_PATH = "header_metrics.json"  # Per-probe timings and latency summary (.json, or .csv for one row per probe)
+BATCH_MODE = False  # Pack many headers per request and bisect only batches that change the response
+MAX_HEADER_BYTES = 6000  # Bytes of test headers per batched request, keep below the target's header limit
+MAX_HEADERS_PER_REQUEST = 80  # Test headers per batched request, many servers reject more than 100 fields
+LENGTH_TOLERANCE = 50  # Response length difference from the baseline still considered unchanged
+BASELINE_SAMPLES = 3  # Control requests (no test header) used to learn what normal responses look like
+ANOMALY_THRESHOLD = 0.5  # Score from which a response counts as changed by the tested header
+
+request_code = """
+import httpx
+
+client = httpx.Client(http2=True)
+request_url = "https://thankyou.cablex.ch:8443/modules/grafana/service/api/access-control/roles"
+request_headers = {"User-Agent": "Mozilla/5.0 (X11; Linux x86_64; rv:128.0) Gecko/20100101 Firefox/128.0", "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8", "Accept-Language": "en-US,en;q=0.5", "Accept-Encoding": "gzip, deflate, br", "X-Api-Key": "a+X25PH05Pz9/fTk/Or05Pf16vX26v39/f3k9A==", "Content-Type": "application/json", "Upgrade-Insecure-Requests": "1", "Sec-Fetch-Dest": "document", "Sec-Fetch-Mode": "navigate", "Sec-Fetch-Site": "none", "Sec-Fetch-User": "?1", "Priority": "u=0, i", "Te": "trailers"}
+response = client.get(request_url, headers=request_headers)
+"""
+
+# ==============================================
+# DO NOT EDIT BELOW THIS LINE UNLESS NECESSARY
+# ==============================================
+
+def add_cache_buster(url, counter):
+    """Add cache-busting parameter to URL if ENABLE_CACHE_BUSTER is True"""
+    if not ENABLE_CACHE_BUSTER:
+        return url
+    
+    parsed = urlparse(url)
+    query = parse_qs(parsed.query)
+    query['test'] = [str(counter)]
+    
+    new_query = urlencode(query, doseq=True)
+    return urlunparse(parsed._replace(query=new_query))
+
+def extract_request_details(request_code):
+    """Extract URL, headers, and other request details from the httpx-generated Python code"""
+    try:
+        # Extract URL
+        url_match = re.search(r"request_url\s*=\s*[\"']([^\"']+)[\"']", request_code)
+        if not url_match:
+            raise ValueError("Could not find URL in request code")
+        
+        url = url_match.group(1)
+        
+        # Extract method (from the client call)
+        method_match = re.search(r"client\.(get|post|put|delete|patch|head|options)\(", request_code, re.IGNORECASE)
+        method = method_match.group(1).lower() if method_match else 'get'
+        
+        # Extract headers
+        headers_match = re.search(r"request_headers\s*=\s*\{([^}]+)\}", request_code, re.DOTALL)
+        original_headers = {}
+        if headers_match:
+            headers_str = headers_match.group(1)
+            # Simple parsing of headers dictionary (won't handle all edge cases)
+            for line in headers_str.split('\n'):
+                line = line.strip()
+                if not line or ':' not in line:
+                    continue
+                key, value = line.split(':', 1)
+                key = key.strip().strip('\'"')
+                value = value.strip().strip(',\'"')
+                original_headers[key] = value
+        
+        # Extract cookies
+        cookies_match = re.search(r"request_cookies\s*=\s*\{([^}]+)\}", request_code, re.DOTALL)
+        cookies = {}
+        if cookies_match:
+            cookies_str = cookies_match.group(1)
+            for line in cookies_str.split('\n'):
+                line = line.strip()
+                if not line or ':' not in line:
+                    continue
+                key, value = line.split(':', 1)
+                key = key.strip().strip('\'"')
+                value = value.strip().strip(',\'"')
+                cookies[key] = value
+        
+        # Extract data if it's a POST/PUT/PATCH request
+        data = None
+        data_match = re.search(r"data\s*=\s*\{([^}]+)\}", request_code, re.DOTALL)
+        if data_match:
+            data_str = data_match.group(1)
+            data = {}
+            for line in data_str.split('\n'):
+                line = line.strip()
+                if not line or ':' not in line:
+                    continue
+                key, value = line.split(':', 1)
+                key = key.strip().strip('\'"')
+                value = value.strip().strip(',\'"')
+                data[key] = value
+        
+        return {
+            'method': method,
+            'url': url,
+            'original_headers': original_headers,
+            'cookies': cookies,
+            'data': data
+        }
+    except Exception as e:
+        print(f"Error parsing request code: {e}")
+        return None
+
+def load_headers(file_path):
+    """
+    Load headers from file, one per line, or from a wordlist pack.
+    Raises KeyError when HEADERS_TIER is not a tier of the pack.
+    """
+    if wordlist_pack is not None and wordlist_pack.is_pack(file_path):
+        names = wordlist_pack.load_wordlist(file_path, HEADERS_TIER)
+    else:
+        if HEADERS_TIER is not None:
+            print(f"{file_path} is not a wordlist pack, ignoring --tier {HEADERS_TIER} and testing all of it")
+        with open(file_path, 'r') as f:
+            names = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+    
+    # Header names are case-insensitive, testing one twice is a wasted request
+    seen = set()
+    headers = []
+    for name in names:
+        if name.lower() not in seen:
+            seen.add(name.lower())
+            headers.append(name)
+    return headers
+
+# Headers sent to targets given as a bare URL in the targets file
+DEFAULT_TARGET_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (X11; Linux x86_64; rv:128.0) Gecko/20100101 Firefox/128.0",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+}
+
+def load_targets(file_path):
+    """
+    Load targets from file, one per line: either a bare URL (GET with
+    DEFAULT_TARGET_HEADERS) or a JSON request template such as
+    {"method": "post", "url": "...", "headers": {...}, "cookies": {...}, "data": {...}}.
+    Returns request details in the same shape as extract_request_details.
+    """
+    targets = []
+    with open(file_path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            
+            if line.startswith('{'):
+                try:
+                    template = json.loads(line)
+                    method = template.get('method', 'get').lower()
+                    if method not in SUPPORTED_METHODS:
+                        raise ValueError(f"unsupported method '{method}'")
+                    targets.append({
+                        'method': method,
+                        'url': template['url'],
+                        'original_headers': dict(template.get('headers') or {}),
+                        'cookies': dict(template.get('cookies') or {}),
+                        'data': template.get('data')
+                    })
+                except (ValueError, KeyError, TypeError, AttributeError) as e:
+                    print(f"Skipping invalid request template on line {line_number}: {e}")
+            else:
+                targets.append({
+                    'method': 'get',
+                    'url': line,
+                    'original_headers': DEFAULT_TARGET_HEADERS.copy(),
+                    'cookies': {},
+                    'data': None
+                })
+    return targets
+
+@functools.lru_cache(maxsize=None)
+def _reflection_pattern(test_value):
+    return re.compile(re.escape(test_value.encode('utf-8')), re.IGNORECASE)
+
+def _raw_header_values(response):
+    """Response header values as bytes (httpx keeps them raw, requests decodes them)"""
+    raw = getattr(response.headers, 'raw', None)
+    if raw is not None:
+        return [value for _, value in raw]
+    return [value.encode('latin-1', 'replace') for value in response.headers.values()]
+
+def find_canaries(response, pattern):
+    """
+    Search the raw response headers and body bytes for pattern (a bytes regex)
+    without decoding or lowercasing a copy of the body. Returns the set of
+    first group matches, or of whole matches if pattern has no group.
+    Bodies streamed with the same pattern were already searched chunk by chunk.
+    """
+    found = set()
+    try:
+        for value in _raw_header_values(response):
+            found.update(pattern.findall(value))
+        if isinstance(response, ProbeResponse) and response.pattern is pattern:
+            found.update(response.matches)
+        else:
+            found.update(pattern.findall(response.content))
+    except Exception:
+        pass
+    return found
+
+def is_value_reflected(response, header_name, test_value):
+    """Check if the test value is reflected in the response"""
+    return bool(find_canaries(response, _reflection_pattern(test_value)))
+
+# Letters-only words, so numbers, ids, timestamps and cache busters never become tokens
+TOKEN_PATTERN = re.compile(rb'[A-Za-z_]{2,}')
+FINGERPRINT_BYTES = 256 * 1024  # Body prefix used for the similarity hash
+SIMHASH_MARGIN = 3  # Extra differing bits allowed beyond what the baseline samples disagree on
+
+def simhash(body):
+    """64-bit similarity hash of the word tokens in body"""
+    counts = Counter(TOKEN_PATTERN.findall(body[:FINGERPRINT_BYTES]))
+    total = sum(counts.values())
+    ones = [0] * 64
+    for token, weight in counts.items():
+        h = zlib.crc32(token) | (zlib.crc32(token, 0x9E3779B9) << 32)
+        while h:
+            low = h & -h
+            ones[low.bit_length() - 1] += weight
+            h ^= low
+    return sum(1 << bit for bit, count in enumerate(ones) if 2 * count > total)
+
+class Fingerprint:
+    """What a response looked like: status, length, header names and body simhash"""
+    __slots__ = ('status', 'length', 'headers', 'simhash')
+
+    def __init__(self, status, length, headers, simhash):
+        self.status = status
+        self.length = length
+        self.headers = headers
+        self.simhash = simhash
+
+    @classmethod
+    def from_response(cls, response):
+        return cls(
+            response.status_code,
+            response_length(response),
+            frozenset(name.lower() for name in response.headers.keys()),
+            simhash(response.content),
+        )
+
+    @property
+    def length_bucket(self):
+        """Power-of-two size class of the body"""
+        return self.length.bit_length()
+
+    def to_dict(self):
+        return {'status': self.status, 'length': self.length,
+                'headers': sorted(self.headers), 'simhash': self.simhash}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['status'], data['length'], frozenset(data['headers']), data['simhash'])
+
+class Baseline:
+    """
+    Normal behaviour learned from several control responses. Whatever the
+    samples disagree on (length spread, optional headers, simhash distance)
+    is treated as noise when scoring a test response.
+    """
+
+    def __init__(self, fingerprints):
+        self.fingerprints = fingerprints
+        self.statuses = {fp.status for fp in fingerprints}
+        self.buckets = {fp.length_bucket for fp in fingerprints}
+        self.min_length = min(fp.length for fp in fingerprints)
+        self.max_length = max(fp.length for fp in fingerprints)
+        self.stable_headers = frozenset.intersection(*(fp.headers for fp in fingerprints))
+        self.seen_headers = frozenset.union(*(fp.headers for fp in fingerprints))
+        self.max_distance = max(
+            (bin(a.simhash ^ b.simhash).count('1') for a, b in itertools.combinations(fingerprints, 2)),
+            default=0
+        )
+
+    def score(self, fp):
+        """Return (score, reasons) describing how far fp is from the baseline"""
+        score, reasons = 0.0, []
+        
+        if fp.status not in self.statuses:
+            score += 1.0
+            reasons.append('status')
+        
+        tolerance = LENGTH_TOLERANCE + (self.max_length - self.min_length)
+        if not self.min_length - tolerance <= fp.length <= self.max_length + tolerance:
+            # A change of size class weighs more than a few extra bytes
+            score += 0.5 if fp.length_bucket in self.buckets else 0.75
+            reasons.append('length')
+        
+        if fp.headers - self.seen_headers or self.stable_headers - fp.headers:
+            score += 0.25
+            reasons.append('headers')
+        
+        distance = min(bin(fp.simhash ^ sample.simhash).count('1') for sample in self.fingerprints)
+        if distance > self.max_distance + SIMHASH_MARGIN:
+            score += 0.5
+            reasons.append('body')
+        
+        return score, reasons
+
+    def is_anomalous(self, fp):
+        return self.score(fp)[0] >= ANOMALY_THRESHOLD
+
+class ScanJournal:
+    """
+    Append-only JSONL log of finished (target, header) probes. Every line
+    is flushed as soon as it is written, so an interrupted scan loses at
+    most the probes still in flight. With resume=True the existing entries
+    are loaded first and new ones appended; otherwise the file starts over.
+    Failed probes are not journaled, so a resumed scan retries them.
+    """
+
+    def __init__(self, path, resume=False):
+        self.path = path
+        self.entries = {}
+        if resume:
+            try:
+                with open(path, 'rb') as f:
+                    data = f.read()
+            except FileNotFoundError:
+                data = b''
+            for line in data.splitlines():
+                try:
+                    entry = json.loads(line)
+                    entry['fingerprint'] = Fingerprint.from_dict(entry['fingerprint'])
+                except (ValueError, KeyError, TypeError):
+                    continue  # Torn last line from a crash
+                self.entries[(entry['target'], entry['header'])] = entry
+        self.file = open(path, 'a' if resume else 'w', encoding='utf-8', buffering=1)
+        if resume and data and not data.endswith(b'\n'):
+            self.file.write("\n")
+
+    @staticmethod
+    def target_key(request_details):
+        return f"{request_details['method'].upper()} {request_details['url']}"
+
+    def get(self, target, header_name):
+        """Journal entry for a finished probe, or None"""
+        return self.entries.get((target, header_name))
+
+    def record(self, target, header_name, fingerprint, reflected, changed, reasons):
+        entry = {
+            'target': target,
+            'header': header_name,
+            'reflected': reflected,
+            'changed': changed,
+            'reasons': list(reasons),
+            'fingerprint': fingerprint.to_dict(),
+        }
+        self.file.write(json.dumps(entry) + "\n")
+        entry['fingerprint'] = fingerprint
+        self.entries[(target, header_name)] = entry
+
+    def close(self):
+        self.file.close()
+
+PROGRESS_INTERVAL = 5.0  # Seconds between live throughput lines
+RATE_WINDOW = 10.0  # Seconds of recent responses the live requests/sec is computed over
+SLOW_HEADER_FACTOR = 3.0  # Time to first byte this many times the target's median flags a header as slowing the server
+SLOW_HEADER_MIN = 0.05  # ...and at least this many seconds above the median
+
+def percentile(values, q):
+    """Nearest-rank percentile of sorted values"""
+    if not values:
+        return None
+    return values[min(len(values) - 1, max(0, math.ceil(q * len(values) / 100) - 1))]
+
+class ProbeMetrics:
+    """
+    Timing phases of every probe, for the latency report and the metrics
+    export. Also prints the live requests/sec every PROGRESS_INTERVAL.
+    """
+    PHASES = ('wait', 'connect', 'tls', 'ttfb', 'body', 'total')
+
+    def __init__(self):
+        self.records = []
+        self.started = time.monotonic()
+        self.recent = deque()
+        self.last_report = self.started
+
+    def add(self, target, header_name, response):
+        now = time.monotonic()
+        self.recent.append(now)
+        while self.recent[0] < now - RATE_WINDOW:
+            self.recent.popleft()
+        
+        record = {'target': target, 'header': header_name, 'time': round(now - self.started, 3)}
+        if response is None:
+            record.update(status="FAILED", length=0)
+        else:
+            record.update(status=response.status_code, length=response_length(response))
+        timings = getattr(response, 'timings', None) or {}
+        for phase in self.PHASES:
+            value = timings.get(phase)
+            record[phase] = round(value, 6) if value is not None else None
+        self.records.append(record)
+        
+        if now - self.last_report >= PROGRESS_INTERVAL:
+            self.last_report = now
+            print(f"[rate] {self.rate():.1f} req/s now, {self.throughput():.1f} req/s overall, "
+                  f"{len(self.records)} probes")
+
+    def rate(self):
+        """Requests per second over the last RATE_WINDOW seconds"""
+        span = min(RATE_WINDOW, time.monotonic() - self.started)
+        return len(self.recent) / span if span > 0 else 0.0
+
+    def throughput(self):
+        elapsed = time.monotonic() - self.started
+        return len(self.records) / elapsed if elapsed > 0 else 0.0
+
+    def by_status(self):
+        """{status: {phase: (p50, p90, p99)}} in seconds, with a 'count' entry"""
+        groups = {}
+        for record in self.records:
+            groups.setdefault(record['status'], []).append(record)
+        
+        summary = {}
+        for status, records in sorted(groups.items(), key=lambda item: str(item[0])):
+            summary[status] = {'count': len(records)}
+            for phase in self.PHASES:
+                values = sorted(r[phase] for r in records if r[phase] is not None)
+                summary[status][phase] = tuple(percentile(values, q) for q in (50, 90, 99))
+        return summary
+
+    def slow_headers(self):
+        """Probes whose time to first byte stands out from the rest of their target, slowest first"""
+        by_target = {}
+        for record in self.records:
+            if record['ttfb'] is not None:
+                by_target.setdefault(record['target'], []).append(record)
+        
+        slow = []
+        for records in by_target.values():
+            median = percentile(sorted(r['ttfb'] for r in records), 50)
+            slow.extend(
+                dict(record, median=median) for record in records
+                if record['ttfb'] >= max(median * SLOW_HEADER_FACTOR, median + SLOW_HEADER_MIN)
+            )
+        return sorted(slow, key=lambda record: record['ttfb'] - record['median'], reverse=True)
+
+    def export(self, path):
+        """Write every probe as CSV (for a .csv path) or probes plus summary as JSON"""
+        if path.lower().endswith('.csv'):
+            with open(path, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, fieldnames=['target', 'header', 'time', 'status', 'length', *self.PHASES])
+                writer.writeheader()
+                writer.writerows(self.records)
+            return
+        
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'probes': len(self.records),
+                'elapsed': round(time.monotonic() - self.started, 3),
+                'requests_per_second': round(self.throughput(), 2),
+                'by_status': {
+                    str(status): {
+                        name: (dict(zip(('p50', 'p90', 'p99'), values)) if name != 'count' else values)
+                        for name, values in phases.items()
+                    }
+                    for status, phases in self.by_status().items()
+                },
+                'slow_headers': [
+                    {'target': r['target'], 'header': r['header'], 'ttfb': r['ttfb'], 'median_ttfb': r['median']}
+                    for r in self.slow_headers()
+                ],
+                'records': self.records,
+            }, f, indent=2)
+
+    def print_report(self):
+        def ms(value):
+            return f"{value * 1000:.0f}" if value is not None else "-"
+        
+        print(f"\nThroughput: {len(self.records)} probes, {self.throughput():.1f} req/s")
+        print("\nLatency by Status (ms, p50/p90/p99):")
+        print("Status".ljust(10) + "Count".ljust(8) + "Total".ljust(20) + "TTFB".ljust(20) + "Connect".ljust(16) + "Wait")
+        for status, phases in self.by_status().items():
+            cells = ["/".join(ms(v) for v in phases[phase]) for phase in ('total', 'ttfb', 'connect', 'wait')]
+            print(f"{str(status).ljust(10)}{str(phases['count']).ljust(8)}{cells[0].ljust(20)}"
+                  f"{cells[1].ljust(20)}{cells[2].ljust(16)}{cells[3]}")
+        
+        slow = self.slow_headers()
+        print(f"\nHeaders that slowed the server down ({len(slow)}):")
+        for record in slow[:20]:
+            print(f"  {record['header']} on {record['target']} (TTFB {ms(record['ttfb'])} ms, "
+                  f"median {ms(record['median'])} ms)")
+
+STREAM_CHUNK_SIZE = 16 * 1024  # Bytes per read when streaming a body
+
+class ProbeResponse:
+    """
+    A streamed response: status, headers and at most MAX_RESPONSE_BYTES of
+    body. length is the Content-Length when the server sent one, otherwise
+    the number of body bytes read. matches holds what pattern found in the
+    body while it was streamed. timings is filled in by the engine.
+    """
+    __slots__ = ('status_code', 'headers', 'content', 'length', 'truncated', 'pattern', 'matches', 'timings')
+
+    def __init__(self, status_code, headers, content, length, truncated, pattern, matches):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.length = length
+        self.truncated = truncated
+        self.pattern = pattern
+        self.matches = matches
+        self.timings = None
+
+class BoundedBody:
+    """
+    Collects body chunks up to MAX_RESPONSE_BYTES, running pattern over
+    each chunk as it arrives. The last few bytes of every chunk are searched
+    again with the next one, so a reflection split across two chunks is
+    still found. feed() returns False once reading can stop.
+    stop_on_match ends reading at the first match, only for probes that are
+    not scored against a Baseline, whose samples were read in full.
+    """
+
+    def __init__(self, headers, pattern=None, stop_on_match=False):
+        self.pattern = pattern
+        # Without a Content-Length the bytes read are the length, so read on to the cap
+        self.stop_on_match = stop_on_match and content_length(headers, None) is not None
+        self.buffer = bytearray()
+        self.read = 0
+        self.tail = b''
+        # Reflections are HEADER_VALUE plus at most a canary suffix
+        self.overlap = len(HEADER_VALUE.encode('utf-8')) + 32
+        self.matches = set()
+        self.truncated = False
+
+    def feed(self, chunk):
+        room = MAX_RESPONSE_BYTES - len(self.buffer)
+        if len(chunk) > room:
+            chunk = chunk[:room]
+            self.truncated = True
+        self.buffer += chunk
+        self.read += len(chunk)
+        
+        if self.pattern is not None:
+            window = self.tail + chunk
+            self.matches.update(self.pattern.findall(window))
+            self.tail = window[-self.overlap:]
+            if self.stop_on_match and self.matches:
+                self.truncated = True
+                return False
+        return not self.truncated
+
+    def finish(self, response):
+        return ProbeResponse(
+            response.status_code,
+            response.headers,
+            bytes(self.buffer),
+            content_length(response.headers, self.read),
+            self.truncated,
+            self.pattern,
+            self.matches,
+        )
+
+def content_length(headers, default):
+    """The Content-Length header as an int, or default when missing or invalid"""
+    try:
+        length = int(headers.get('Content-Length', ''))
+    except ValueError:
+        return default
+    return length if length >= 0 else default
+
+def response_length(response):
+    """Body length of a response, without touching the body of a streamed one"""
+    if isinstance(response, ProbeResponse):
+        return response.length
+    return len(response.content)
+
+SUPPORTED_METHODS = ('get', 'post', 'put', 'delete', 'patch', 'head', 'options')
+BODY_METHODS = ('post', 'put', 'patch')
+
+THROTTLE_STATUS_CODES = (429, 503)  # The target asks us to slow down
+TRANSIENT_STATUS_CODES = (502, 504)  # Worth retrying, but not a verdict on the header
+BACKOFF_BASE = 0.5  # Seconds, doubled on every retry before jitter
+BACKOFF_MAX = 30.0  # Longest backoff or Retry-After we are willing to wait
+LATENCY_BACKOFF_FACTOR = 2.0  # Recent latency this many times the long-run average counts as congestion
+MIN_RATE = 1.0  # Never throttle a host below this many requests per second
+
+def send_request(method, url, headers, cookies=None, data=None, session=None, pattern=None, stop_on_match=False):
+    """
+    Send HTTP request with error handling, reusing session's connections if
+    given. With STREAM_RESPONSES the body is read through a BoundedBody
+    searching for pattern, and a ProbeResponse is returned.
+    """
+    if method not in SUPPORTED_METHODS:
+        raise ValueError(f"Unsupported HTTP method: {method}")
+    if method not in BODY_METHODS:
+        data = None
+    
+    try:
+        start = time.perf_counter()
+        response = (session or requests).request(
+            method.upper(), url, headers=headers, cookies=cookies, data=data,
+            timeout=REQUEST_TIMEOUT, verify=False, stream=STREAM_RESPONSES
+        )
+        headers_done = time.perf_counter()
+        if STREAM_RESPONSES:
+            with response:
+                body = BoundedBody(response.headers, pattern, stop_on_match)
+                for chunk in response.iter_content(STREAM_CHUNK_SIZE):
+                    if not body.feed(chunk):
+                        break
+                response = body.finish(response)
+        
+        # requests only tells us when the headers arrived (and only by a stream-less download, with the body)
+        end = time.perf_counter()
+        response.timings = {
+            'ttfb': response.elapsed.total_seconds() if hasattr(response, 'elapsed') else headers_done - start,
+            'body': end - headers_done if STREAM_RESPONSES else None,
+            'total': end - start,
+        }
+        return response
+    except requests.exceptions.RequestException as e:
+        print(f"Request failed: {e}")
+        return None
+
+def parse_retry_after(value):
+    """Return the Retry-After header (seconds or HTTP date) as seconds, or None"""
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+    return min(max(seconds, 0.0), BACKOFF_MAX)
+
+def backoff_delay(attempt):
+    """Exponential backoff with full jitter for the given retry attempt"""
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+class AdaptiveController:
+    """
+    Per-host admission control for the async engine.
+    The number of requests in flight follows AIMD: it grows by one per
+    window of successful responses (doubling during slow start), shrinks
+    when latency blows up and is halved on 429/503 or transient errors.
+    A token bucket caps the request rate; it grows the same way and is
+    halved only when the target refuses requests, and it is paused
+    entirely while a Retry-After is pending. With adaptive=False this is
+    a plain max_concurrency semaphore. shared, if given, is a semaphore
+    every host also takes a slot from, capping requests in flight overall.
+    """
+
+    def __init__(self, adaptive=True, max_concurrency=None, shared=None):
+        self.adaptive = adaptive
+        self.max_concurrency = max_concurrency or CONCURRENCY
+        self.limit = float(min(2, self.max_concurrency) if adaptive else self.max_concurrency)
+        self.shared = shared
+        self.rate = INITIAL_RATE
+        self.tokens = 1.0
+        self.slow_start = True
+        self.in_flight = 0
+        self.waiters = deque()  # acquire() calls queued for a slot, oldest first
+        
+        now = time.monotonic()
+        self.refilled = now
+        self.blocked_until = now
+        self.last_decrease = 0.0
+        self.latency = None  # Fast moving average, the last few responses
+        self.baseline_latency = None  # Slow moving average, the host's usual latency
+        
+        self.sent = 0
+        self.throttled = 0
+        self.errors = 0
+        self.retries = 0
+
+    async def acquire(self):
+        """Wait for a concurrency slot and, in adaptive mode, a rate token"""
+        if self.in_flight < int(self.limit) and not self.waiters:
+            self.in_flight += 1
+        else:
+            # Slots are handed to one waiter at a time, waking every queued probe on each release costs O(n^2)
+            waiter = asyncio.get_running_loop().create_future()
+            self.waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    self.in_flight -= 1  # Got the slot just as it was cancelled, pass it on
+                    self._wake()
+                else:
+                    self.waiters.remove(waiter)
+                raise
+        
+        while self.adaptive:
+            now = time.monotonic()
+            if now < self.blocked_until:
+                await asyncio.sleep(self.blocked_until - now)
+                continue
+            
+            # Refill, allowing a burst of at most one second worth of tokens
+            self.tokens = min(self.rate, self.tokens + (now - self.refilled) * self.rate)
+            self.refilled = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                break
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+        
+        if self.shared is not None:
+            await self.shared.acquire()
+        self.sent += 1
+
+    def _increase(self):
+        if self.slow_start:
+            self.limit = min(self.max_concurrency, self.limit + 1)
+            self.rate = min(MAX_RATE, self.rate + 1)
+        else:
+            self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+            self.rate = min(MAX_RATE, self.rate + 1 / self.rate)
+
+    def _decrease(self, factor, rate=True):
+        # Responses already in flight saw the same congestion, react once per round trip
+        now = time.monotonic()
+        if now - self.last_decrease < (self.latency or 0.0):
+            return
+        self.last_decrease = now
+        self.limit = max(1.0, self.limit * factor)
+        if rate:
+            # Only a refusal by the target ends slow start and lowers the rate
+            self.slow_start = False
+            self.rate = max(MIN_RATE, self.rate * factor)
+
+    async def release(self, outcome, latency=None, retry_after=None):
+        """
+        Report how a request went: 'ok', 'throttled', 'error' (transient) or
+        None for failures that say nothing about the target.
+        """
+        if self.shared is not None:
+            self.shared.release()
+        
+        if outcome == 'throttled':
+            self.throttled += 1
+        elif outcome == 'error':
+            self.errors += 1
+        
+        if self.adaptive:
+            if retry_after:
+                self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
+            
+            if latency is not None and outcome == 'ok':
+                if self.latency is None:
+                    self.latency = self.baseline_latency = latency
+                self.latency = 0.8 * self.latency + 0.2 * latency
+                self.baseline_latency = 0.99 * self.baseline_latency + 0.01 * latency
+            
+            if outcome in ('throttled', 'error'):
+                self._decrease(0.5)
+            elif outcome == 'ok':
+                if self.latency > LATENCY_BACKOFF_FACTOR * max(self.baseline_latency, 0.001):
+                    # Queueing at the target, fewer requests in flight but the same rate
+                    self._decrease(0.9, rate=False)
+                else:
+                    self._increase()
+        
+        self.in_flight -= 1
+        self._wake()
+
+    def _wake(self):
+        """Hand free slots to the oldest waiters"""
+        while self.waiters and self.in_flight < int(self.limit):
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    @property
+    def error_rate(self):
+        return (self.throttled + self.errors) / self.sent if self.sent else 0.0
+
+def create_async_client(cookies=None, max_connections=None):
+    """Create a pooled httpx.AsyncClient sized for max_connections (default CONCURRENCY) keep-alive connections"""
+    http2 = ENABLE_HTTP2 and importlib.util.find_spec('h2') is not None
+    max_connections = max_connections or CONCURRENCY
+    return httpx.AsyncClient(
+        http2=http2,
+        verify=False,
+        timeout=REQUEST_TIMEOUT,
+        cookies=cookies,
+        limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+    )
+
+def phase_timings(events, start, end):
+    """
+    Split a request into phases from httpcore trace events (name -> time):
+    wait for a pooled connection, TCP connect (including DNS), TLS
+    handshake, time to first byte and body transfer. Phases that did not
+    happen, like connect on a reused connection, are 0.
+    """
+    def span(first, last):
+        if first in events and last in events:
+            return events[last] - events[first]
+        return 0.0
+    
+    sent = next((events[name] for name in events if name.endswith('.send_request_headers.started')), None)
+    received = next((events[name] for name in events if name.endswith('.receive_response_headers.complete')), None)
+    return {
+        'wait': (min(events.values()) - start) if events else None,
+        'connect': span('connection.connect_tcp.started', 'connection.connect_tcp.complete'),
+        'tls': span('connection.start_tls.started', 'connection.start_tls.complete'),
+        'ttfb': received - sent if sent is not None and received is not None else None,
+        'body': end - received if received is not None else None,
+        'total': end - start,
+    }
+
+async def read_bounded(client, method, url, headers, data, pattern, stop_on_match, extensions=None):
+    """Send a request and stream its body through a BoundedBody, return a ProbeResponse"""
+    request = client.build_request(method, url, headers=headers, data=data, extensions=extensions)
+    response = await client.send(request, stream=True)
+    try:
+        body = BoundedBody(response.headers, pattern, stop_on_match)
+        async for chunk in response.aiter_bytes(STREAM_CHUNK_SIZE):
+            if not body.feed(chunk):
+                break
+        return body.finish(response)
+    finally:
+        await response.aclose()
+
+async def send_request_async(client, controller, method, url, headers, data=None, pattern=None, stop_on_match=False):
+    """
+    Send HTTP request through the shared async client under the host's
+    AdaptiveController, retrying throttled responses and transient errors
+    with jittered backoff (or the server's Retry-After). With
+    STREAM_RESPONSES the body is read as in send_request.
+    """
+    if method not in SUPPORTED_METHODS:
+        raise ValueError(f"Unsupported HTTP method: {method}")
+    if method not in BODY_METHODS:
+        data = None
+    
+    for attempt in range(MAX_RETRIES + 1):
+        if attempt:
+            controller.retries += 1
+        await controller.acquire()
+        events = {}
+        
+        async def trace(event_name, info):
+            events.setdefault(event_name, time.perf_counter())
+        
+        start = time.monotonic()
+        started = time.perf_counter()
+        try:
+            if STREAM_RESPONSES:
+                response = await read_bounded(
+                    client, method.upper(), url, headers, data, pattern, stop_on_match, {'trace': trace}
+                )
+            else:
+                response = await client.request(
+                    method.upper(), url, headers=headers, data=data, extensions={'trace': trace}
+                )
+        except (httpx.TimeoutException, httpx.NetworkError, httpx.RemoteProtocolError) as e:
+            await controller.release('error')
+            if attempt < MAX_RETRIES:
+                await asyncio.sleep(backoff_delay(attempt))
+                continue
+            print(f"Request failed: {e}")
+            return None
+        except httpx.HTTPError as e:
+            # Refused on our side (e.g. an invalid header value), not the target's fault
+            await controller.release(None)
+            print(f"Request failed: {e}")
+            return None
+        latency = time.monotonic() - start
+        response.timings = phase_timings(events, started, time.perf_counter())
+        
+        if response.status_code in THROTTLE_STATUS_CODES or response.status_code in TRANSIENT_STATUS_CODES:
+            throttled = response.status_code in THROTTLE_STATUS_CODES
+            retry_after = parse_retry_after(response.headers.get('Retry-After')) if throttled else None
+            await controller.release('throttled' if throttled else 'error', latency, retry_after)
+            if attempt < MAX_RETRIES:
+                await asyncio.sleep(retry_after if retry_after is not None else backoff_delay(attempt))
+                continue
+            return response
+        
+        await controller.release('ok', latency)
+        return response
+
+# Headers that change how the request itself is framed or routed, always tested alone
+SINGLE_ONLY_HEADERS = {'content-length', 'transfer-encoding', 'host', 'connection', 'expect', 'upgrade', 'te'}
+
+def with_cookie_header(request_details):
+    """Original headers with the target's cookies folded into a Cookie header"""
+    headers = request_details['original_headers'].copy()
+    if request_details['cookies'] and not any(name.lower() == 'cookie' for name in headers):
+        headers['Cookie'] = "; ".join(f"{name}={value}" for name, value in request_details['cookies'].items())
+    return headers
+
+def build_probe(request_details, header_name, counter, base_headers=None):
+    """Return (url, headers) for testing one header"""
+    # Prepare headers - keep original ones and add our test header
+    test_headers = (base_headers if base_headers is not None else request_details['original_headers']).copy()
+    test_headers[header_name] = HEADER_VALUE
+    
+    # Add cache buster if enabled
+    request_url = add_cache_buster(request_details['url'], counter)
+    return request_url, test_headers
+
+def run_sync(request_details, headers_to_test, on_response, skip=frozenset()):
+    """Test every header (except wordlist positions in skip) one after another over a pooled requests.Session"""
+    with requests.Session() as session:
+        samples = []
+        for i in range(BASELINE_SAMPLES):
+            response = send_request(
+                request_details['method'],
+                add_cache_buster(request_details['url'], len(headers_to_test) + 1 + i),
+                request_details['original_headers'].copy(),
+                request_details['cookies'],
+                request_details['data'],
+                session=session
+            )
+            if response is not None:
+                samples.append(Fingerprint.from_response(response))
+        baseline = Baseline(samples) if samples else None
+        
+        for i, header_name in enumerate(headers_to_test, 1):
+            if i in skip:
+                continue
+            request_url, test_headers = build_probe(request_details, header_name, i)
+            response = send_request(
+                request_details['method'],
+                request_url,
+                test_headers,
+                request_details['cookies'],
+                request_details['data'],
+                session=session,
+                pattern=_reflection_pattern(HEADER_VALUE),
+                # A body cut short at the reflection can't be compared with the full baseline samples
+                stop_on_match=baseline is None
+            )
+            on_response(i, header_name, response, baseline)
+
+async def run_async(request_details, headers_to_test, on_response, skip=frozenset()):
+    """Test every header (except wordlist positions in skip) concurrently over one pooled (optionally HTTP/2) client"""
+    host = urlparse(request_details['url']).netloc
+    controllers = {host: AdaptiveController(ADAPTIVE_RATE_CONTROL)}
+    
+    async def probe(i, header_name):
+        request_url, test_headers = build_probe(request_details, header_name, i)
+        response = await send_request_async(
+            client, controllers[host],
+            request_details['method'],
+            request_url,
+            test_headers,
+            request_details['data'],
+            _reflection_pattern(HEADER_VALUE),
+            stop_on_match=baseline is None
+        )
+        on_response(i, header_name, response, baseline)
+    
+    async with create_async_client(request_details['cookies']) as client:
+        baseline = await collect_baseline(client, controllers[host], request_details, len(headers_to_test) + 1)
+        await asyncio.gather(*(
+            probe(i, header_name) for i, header_name in enumerate(headers_to_test, 1) if i not in skip
+        ))
+    return controllers
+
+async def collect_baseline(client, controller, request_details, counter, base_headers=None):
+    """Send BASELINE_SAMPLES control requests without test headers, return a Baseline or None"""
+    if base_headers is None:
+        base_headers = request_details['original_headers']
+    samples = []
+    for i in range(BASELINE_SAMPLES):
+        response = await send_request_async(
+            client, controller,
+            request_details['method'],
+            add_cache_buster(request_details['url'], counter + i),
+            base_headers.copy(),
+            request_details['data']
+        )
+        if response is not None:
+            samples.append(Fingerprint.from_response(response))
+    return Baseline(samples) if samples else None
+
+def make_canary(index, width):
+    """Unique test value for the header at wordlist position index"""
+    # Fixed width digits and a terminator, so no canary is a substring of another
+    return f"{HEADER_VALUE}{index:0{width}d}x"
+
+def pack_batches(headers_to_test, canaries, budget=MAX_HEADER_BYTES, max_headers=MAX_HEADERS_PER_REQUEST):
+    """Pack wordlist positions into batches of at most max_headers test headers and budget bytes"""
+    batches = []
+    batch, size = [], 0
+    for i, header_name in enumerate(headers_to_test, 1):
+        if header_name.lower() in SINGLE_ONLY_HEADERS:
+            batches.append([i])
+            continue
+        
+        cost = len(header_name) + len(canaries[i]) + 4  # "Name: value\r\n"
+        if batch and (size + cost > budget or len(batch) >= max_headers):
+            batches.append(batch)
+            batch, size = [], 0
+        batch.append(i)
+        size += cost
+    if batch:
+        batches.append(batch)
+    return batches
+
+async def batch_test_target(client, controller, request_details, headers_to_test, on_batch, base_headers=None):
+    """
+    Group-test the headers: send as many as fit in one request, each with
+    its own canary so reflections name their header directly, and bisect a
+    batch only when it changes the response without a reflected canary.
+    Finding k interesting headers among N takes about O(k log N) requests.
+    on_batch(indices, response, reflected, anomalous) is called per request.
+    Returns (anomalous header positions, requests sent).
+    """
+    if base_headers is None:
+        base_headers = request_details['original_headers']
+    width = len(str(len(headers_to_test)))
+    canaries = {i: make_canary(i, width) for i in range(1, len(headers_to_test) + 1)}
+    pattern = re.compile(re.escape(HEADER_VALUE.encode('utf-8')) + rb'(\d{%d})x' % width, re.IGNORECASE)
+    counter = itertools.count(len(headers_to_test) + 1)
+    
+    anomalies = set()
+    sent = 0
+    
+    async def send(indices):
+        nonlocal sent
+        test_headers = base_headers.copy()
+        for i in indices:
+            test_headers[headers_to_test[i - 1]] = canaries[i]
+        sent += 1
+        # Keep reading after the first canary, the others may come later in the body
+        return await send_request_async(
+            client, controller,
+            request_details['method'],
+            add_cache_buster(request_details['url'], next(counter)),
+            test_headers,
+            request_details['data'],
+            pattern
+        )
+    
+    async def test_batch(indices):
+        response = await send(indices)
+        if response is None:
+            on_batch(indices, None, set(), False)
+            if len(indices) > 1:
+                # One of the headers may have made the request unsendable
+                await bisect(indices)
+            return
+        
+        reflected = {int(match) for match in find_canaries(response, pattern)} & set(indices)
+        anomalous = baseline.is_anomalous(Fingerprint.from_response(response))
+        on_batch(indices, response, reflected, anomalous)
+        if not anomalous:
+            return
+        
+        if reflected:
+            # The reflections may explain the change, check whatever else was in the batch
+            rest = [i for i in indices if i not in reflected]
+            if rest:
+                await test_batch(rest)
+        elif len(indices) == 1:
+            anomalies.add(indices[0])
+        else:
+            await bisect(indices)
+    
+    async def bisect(indices):
+        middle = len(indices) // 2
+        await asyncio.gather(test_batch(indices[:middle]), test_batch(indices[middle:]))
+    
+    # Baseline: the original request without any test header
+    baseline = await collect_baseline(client, controller, request_details, next(counter), base_headers)
+    sent += BASELINE_SAMPLES
+    counter = itertools.count(next(counter) + BASELINE_SAMPLES)
+    if baseline is None:
+        print(f"Baseline requests failed for {request_details['url']}, cannot run batch mode")
+        return anomalies, sent
+    print(f"Baseline: Status {sorted(baseline.statuses)}, "
+          f"Length {baseline.min_length}-{baseline.max_length}\n")
+    
+    batches = pack_batches(headers_to_test, canaries)
+    print(f"Packed {len(headers_to_test)} headers into {len(batches)} requests\n")
+    await asyncio.gather(*(test_batch(batch) for batch in batches))
+    
+    return anomalies, sent
+
+async def run_batched(request_details, headers_to_test, on_batch):
+    """Batch-test one target over its own client. Returns (controllers, anomalies, requests sent)."""
+    controller = AdaptiveController(ADAPTIVE_RATE_CONTROL)
+    host = urlparse(request_details['url']).netloc
+    async with create_async_client(request_details['cookies']) as client:
+        anomalies, sent = await batch_test_target(client, controller, request_details, headers_to_test, on_batch)
+    return {host: controller}, anomalies, sent
+
+async def scan_targets(targets, headers_to_test, on_result, on_batch=None, skip=frozenset()):
+    """
+    Test the header wordlist against many targets in one event loop.
+    Targets are grouped by host; every host gets its own connection pool
+    and AdaptiveController capped at PER_HOST_CONCURRENCY, and all hosts
+    share one CONCURRENCY semaphore whose FIFO wake-ups interleave the
+    hosts, so a slow host only ever ties up its own few slots. At most
+    MAX_ACTIVE_HOSTS hosts are open at once.
+    on_result(target_index, i, header_name, response, baseline) is called
+    per probe; with on_batch, targets are group-tested instead and
+    on_batch(target_index, indices, response, reflected, anomalous) is
+    called per request. (target_index, i) pairs in skip are not probed.
+    Returns (controllers, {target_index: anomalies}).
+    """
+    shared = asyncio.Semaphore(CONCURRENCY)
+    active_hosts = asyncio.Semaphore(MAX_ACTIVE_HOSTS)
+    controllers = {}
+    anomalies = {}
+    
+    by_host = {}
+    for t, target in enumerate(targets):
+        by_host.setdefault(urlparse(target['url']).netloc, []).append(t)
+    
+    async def scan_host(host, target_indexes):
+        async with active_hosts:
+            controller = controllers[host] = AdaptiveController(
+                ADAPTIVE_RATE_CONTROL, PER_HOST_CONCURRENCY, shared
+            )
+            base_headers = {t: with_cookie_header(targets[t]) for t in target_indexes}
+            
+            async with create_async_client(max_connections=PER_HOST_CONCURRENCY) as client:
+                if on_batch is not None:
+                    async def batch_target(t):
+                        found, _ = await batch_test_target(
+                            client, controller, targets[t], headers_to_test,
+                            functools.partial(on_batch, t), base_headers[t]
+                        )
+                        anomalies[t] = found
+                    await asyncio.gather(*(batch_target(t) for t in target_indexes))
+                    return
+                
+                # Interleave this host's targets so each gets results early
+                work = [
+                    (t, i, header_name)
+                    for i, header_name in enumerate(headers_to_test, 1)
+                    for t in target_indexes
+                    if (t, i) not in skip
+                ]
+                pending = {t for t, _, _ in work}
+                
+                baselines = await asyncio.gather(*(
+                    collect_baseline(client, controller, targets[t], len(headers_to_test) + 1, base_headers[t])
+                    for t in pending
+                ))
+                baselines = dict(zip(pending, baselines))
+                work = iter(work)
+                
+                async def worker():
+                    for t, i, header_name in work:
+                        request_url, test_headers = build_probe(targets[t], header_name, i, base_headers[t])
+                        response = await send_request_async(
+                            client, controller,
+                            targets[t]['method'],
+                            request_url,
+                            test_headers,
+                            targets[t]['data'],
+                            _reflection_pattern(HEADER_VALUE),
+                            stop_on_match=baselines[t] is None
+                        )
+                        on_result(t, i, header_name, response, baselines[t])
+                
+                await asyncio.gather(*(worker() for _ in range(PER_HOST_CONCURRENCY)))
+    
+    await asyncio.gather(*(scan_host(host, indexes) for host, indexes in by_host.items()))
+    return controllers, anomalies
+
+def run_multi_target(targets, headers_to_test, results_path, batch_mode, journal=None, metrics=None):
+    """
+    Scan every target, streaming one JSON line per probe to results_path,
+    and print a summary. Probes already in journal are not sent again,
+    their results are copied to results_path and the summary from it.
+    Timings of the probes that are sent go to metrics.
+    """
+    summary = {t: {'reflected': [], 'changed': [], 'failed': 0, 'probes': 0} for t in range(len(targets))}
+    status_codes = {}
+    done = 0
+    total = len(targets) * len(headers_to_test)
+    keys = [ScanJournal.target_key(target) for target in targets]
+    
+    with open(results_path, 'w', encoding='utf-8') as out:
+        def write(t, header_name, status, length, reflected, changed, reasons=()):
+            out.write(json.dumps({
+                'target': targets[t]['url'],
+                'method': targets[t]['method'],
+                'header': header_name,
+                'status': status,
+                'length': length,
+                'reflected': reflected,
+                'changed': changed,
+                'reasons': list(reasons),
+            }) + "\n")
+        
+        def add_result(t, header_name, fingerprint, reflected, changed, reasons):
+            status_codes[fingerprint.status] = status_codes.get(fingerprint.status, 0) + 1
+            if reflected:
+                summary[t]['reflected'].append(header_name)
+            if changed:
+                summary[t]['changed'].append(header_name)
+            write(t, header_name, fingerprint.status, fingerprint.length, reflected, changed, reasons)
+        
+        # Results of an earlier, interrupted run
+        skip = set()
+        if journal is not None and not batch_mode:
+            for t in range(len(targets)):
+                for i, header_name in enumerate(headers_to_test, 1):
+                    entry = journal.get(keys[t], header_name)
+                    if entry is not None:
+                        skip.add((t, i))
+                        summary[t]['probes'] += 1
+                        add_result(t, header_name, entry['fingerprint'],
+                                   entry['reflected'], entry['changed'], entry['reasons'])
+            if skip:
+                print(f"Resuming: {len(skip)} of {total} probes already done\n")
+            done = len(skip)
+        
+        def on_result(t, i, header_name, response, baseline):
+            nonlocal done
+            done += 1
+            summary[t]['probes'] += 1
+            if metrics is not None:
+                metrics.add(keys[t], header_name, response)
+            if response is None:
+                summary[t]['failed'] += 1
+                write(t, header_name, "FAILED", 0, False, False)
+                return
+            
+            reflected = is_value_reflected(response, header_name, HEADER_VALUE)
+            fingerprint = Fingerprint.from_response(response)
+            score, reasons = baseline.score(fingerprint) if baseline else (0.0, [])
+            changed = score >= ANOMALY_THRESHOLD
+            add_result(t, header_name, fingerprint, reflected, changed, reasons)
+            if journal is not None:
+                journal.record(keys[t], header_name, fingerprint, reflected, changed, reasons)
+            
+            if reflected or changed or done % 500 == 0:
+                print(f"[{done}/{total}] {targets[t]['url']} {header_name} -> Status: {response.status_code}, "
+                      f"Length: {fingerprint.length}, Reflected: {reflected}, Changed: {changed}")
+        
+        def on_batch(t, indices, response, reflected, anomalous):
+            summary[t]['probes'] += 1
+            if metrics is not None:
+                metrics.add(keys[t], f"[{len(indices)} headers]", response)
+            if response is None:
+                summary[t]['failed'] += 1
+                return
+            status_codes[response.status_code] = status_codes.get(response.status_code, 0) + 1
+            for i in sorted(reflected):
+                header_name = headers_to_test[i - 1]
+                summary[t]['reflected'].append(header_name)
+                write(t, header_name, response.status_code, response_length(response), True, anomalous)
+                print(f"{targets[t]['url']} {header_name} -> Reflected")
+        
+        try:
+            controllers, anomalies = asyncio.run(
+                scan_targets(targets, headers_to_test, on_result, on_batch if batch_mode else None, skip)
+            )
+        except KeyboardInterrupt:
+            print(f"\nInterrupted after {done} of {total} probes"
+                  + (", rerun with --resume to continue" if journal is not None and not batch_mode else ""))
+            return
+        
+        # In batch mode only the bisected-down headers are known to change the response
+        for t, found in anomalies.items():
+            for i in sorted(found):
+                summary[t]['changed'].append(headers_to_test[i - 1])
+                write(t, headers_to_test[i - 1], None, None, False, True)
+    
+    print("\n" + "="*80)
+    print("TESTING COMPLETE - SUMMARY")
+    print("="*80)
+    print(f"\nTargets: {len(targets)}, Hosts: {len(controllers)}, Results: {results_path}")
+    
+    print("\nStatus Codes Received:")
+    for code, count in sorted(status_codes.items()):
+        print(f"  {code}: {count} requests")
+    
+    print("\nPer Target:")
+    for t, target in enumerate(targets):
+        entry = summary[t]
+        print(f"  {target['method'].upper()} {target['url']}: {entry['probes']} requests, {entry['failed']} failed")
+        for header_name in entry['reflected']:
+            print(f"    reflected: {header_name}")
+        for header_name in entry['changed']:
+            print(f"    changed:   {header_name}")
+    
+    if ADAPTIVE_RATE_CONTROL:
+        print("\nRate Control:")
+        for host, controller in controllers.items():
+            print(f"  {host}: concurrency {int(controller.limit)}, {controller.rate:.1f} req/s, "
+                  f"{controller.throttled} throttled, {controller.errors} errors, "
+                  f"{controller.retries} retries, error rate {controller.error_rate:.1%}")
+    
+    if metrics is not None:
+        metrics.print_report()
+
+def parse_arguments():
+    """Parse command line arguments, defaulting to the configuration above"""
+    parser = argparse.ArgumentParser(description='Test which uncommon request headers a target reacts to')
+    parser.add_argument('-t', '--targets',
+                        help='File of targets, one URL or JSON request template per line '
+                             '(default: the single request in request_code)')
+    parser.add_argument('-w', '--headers', default=HEADERS_FILE_PATH,
+                        help=f'Header wordlist, text or pack (default: {HEADERS_FILE_PATH})')
+    parser.add_argument('--tier', default=HEADERS_TIER,
+                        help='Only test this tier of a wordlist pack, e.g. small or medium')
+    parser.add_argument('-o', '--output', default=RESULTS_FILE_PATH,
+                        help=f'JSONL results file for --targets scans (default: {RESULTS_FILE_PATH})')
+    parser.add_argument('-c', '--concurrency', type=int, default=CONCURRENCY,
+                        help=f'Maximum requests in flight overall (default: {CONCURRENCY})')
+    parser.add_argument('--per-host', type=int, default=PER_HOST_CONCURRENCY,
+                        help=f'Maximum requests in flight per host with --targets (default: {PER_HOST_CONCURRENCY})')
+    parser.add_argument('--batch', action='store_true', default=BATCH_MODE,
+                        help='Pack many headers per request and bisect on changes')
+    parser.add_argument('--journal', default=JOURNAL_FILE_PATH,
+                        help=f'Append-only log of finished probes (default: {JOURNAL_FILE_PATH})')
+    parser.add_argument('--resume', action='store_true',
+                        help='Skip probes already in the journal and rebuild the results from it')
+    parser.add_argument('--metrics', default=METRICS_FILE_PATH,
+                        help=f'Per-probe timing export, JSON or CSV by extension (default: {METRICS_FILE_PATH})')
+    return parser.parse_args()
+
+def main():
+    global HEADERS_FILE_PATH, HEADERS_TIER, CONCURRENCY, PER_HOST_CONCURRENCY
+    args = parse_arguments()
+    HEADERS_FILE_PATH = args.headers
+    HEADERS_TIER = args.tier
+    CONCURRENCY = max(1, args.concurrency)
+    PER_HOST_CONCURRENCY = max(1, args.per_host)
+    
+    if args.targets:
+        main_multi_target(args)
+        return
+    
+    # Read the request code from the variable above
+    
+    # Extract request details
+    request_details = extract_request_details(request_code)
+    if not request_details:
+        print("Failed to parse request code. Please check the format.")
+        return
+    
+    print(f"\nTarget URL: {request_details['url']}")
+    print(f"Original Method: {request_details['method'].upper()}")
+    print(f"Original Headers: {len(request_details['original_headers'])} headers")
+    print(f"Original Cookies: {len(request_details['cookies'])} cookies")
+    if request_details['data']:
+        print(f"Request Data: {request_details['data']}")
+    print(f"Testing with header value: '{HEADER_VALUE}'")
+    print(f"Cache buster: {'ENABLED' if ENABLE_CACHE_BUSTER else 'DISABLED'}")
+    engine = ENGINE
+    if engine == 'async' and httpx is None:
+        print("httpx is not installed, falling back to the sync engine (pip install 'httpx[http2]')")
+        engine = 'sync'
+    print(f"Engine: {engine}" + (f" (concurrency {CONCURRENCY})" if engine == 'async' else ""))
+    batch_mode = args.batch
+    if batch_mode and engine != 'async':
+        print("Batch mode needs the async engine, testing one header per request")
+        batch_mode = False
+    print(f"Batch mode: {'ENABLED' if batch_mode else 'DISABLED'}")
+    print("="*80)
+    
+    # Load headers to test
+    try:
+        headers_to_test = load_headers(HEADERS_FILE_PATH)
+    except FileNotFoundError:
+        print(f"Error: Headers file not found at {HEADERS_FILE_PATH}")
+        return
+    except KeyError as e:
+        print(f"Error: {e.args[0]}")
+        return
+    
+    print(f"Loaded {len(headers_to_test)} headers to test\n")
+    
+    # Test each header
+    results = [None] * len(headers_to_test)  # Filled by wordlist position as responses arrive
+    status_codes = {}
+    
+    # Batch sweeps are only a few dozen requests, only per-header probes are journaled
+    journal = None if batch_mode else ScanJournal(args.journal, args.resume)
+    target_key = ScanJournal.target_key(request_details)
+    metrics = ProbeMetrics()
+    skip = set()
+    if journal is not None:
+        for i, header_name in enumerate(headers_to_test, 1):
+            entry = journal.get(target_key, header_name)
+            if entry is not None:
+                fingerprint = entry['fingerprint']
+                results[i - 1] = (header_name, fingerprint.status, fingerprint.length,
+                                  entry['reflected'], entry['changed'])
+                status_codes[fingerprint.status] = status_codes.get(fingerprint.status, 0) + 1
+                skip.add(i)
+        if skip:
+            print(f"Resuming: {len(skip)} of {len(headers_to_test)} headers already tested\n")
+    
+    def on_response(i, header_name, response, baseline):
+        metrics.add(target_key, header_name, response)
+        if response is None:
+            print(f"Testing header {i}/{len(headers_to_test)}: {header_name}")
+            print("  -> Request failed\n")
+            results[i - 1] = (header_name, "FAILED", 0, False, False)
+            return
+        
+        # Check if value is reflected
+        reflected = is_value_reflected(response, header_name, HEADER_VALUE)
+        
+        # Compare against the baseline
+        fingerprint = Fingerprint.from_response(response)
+        score, reasons = baseline.score(fingerprint) if baseline else (0.0, [])
+        changed = score >= ANOMALY_THRESHOLD
+        
+        # Record status code
+        status_code = response.status_code
+        status_codes[status_code] = status_codes.get(status_code, 0) + 1
+        
+        # Store results
+        results[i - 1] = (
+            header_name,
+            status_code,
+            fingerprint.length,
+            reflected,
+            changed
+        )
+        if journal is not None:
+            journal.record(target_key, header_name, fingerprint, reflected, changed, reasons)
+        
+        # Print current result
+        print(f"Testing header {i}/{len(headers_to_test)}: {header_name}")
+        print(f"  -> Status: {status_code}, Length: {fingerprint.length}, Reflected: {reflected}, "
+              f"Changed: {changed}" + (f" ({', '.join(reasons)})" if changed else "") + "\n")
+    
+    def on_batch(indices, response, reflected, anomalous):
+        metrics.add(target_key, f"[{len(indices)} headers]", response)
+        if response is None:
+            print(f"Batch of {len(indices)} headers: {headers_to_test[indices[0] - 1]} ...")
+            print("  -> Request failed\n")
+            for i in indices:
+                results[i - 1] = (headers_to_test[i - 1], "FAILED", 0, False, False)
+            return
+        
+        status_code = response.status_code
+        status_codes[status_code] = status_codes.get(status_code, 0) + 1
+        
+        # Smaller batches come later and overwrite what the bigger ones recorded
+        for i in indices:
+            results[i - 1] = (headers_to_test[i - 1], status_code, response_length(response), i in reflected, False)
+        
+        names = ", ".join(headers_to_test[i - 1] for i in sorted(reflected)) or "none"
+        print(f"Batch of {len(indices)} headers: {headers_to_test[indices[0] - 1]} ...")
+        print(f"  -> Status: {status_code}, Length: {response_length(response)}, "
+              f"Changed: {anomalous}, Reflected: {names}\n")
+    
+    controllers = {}
+    sent = None
+    try:
+        if batch_mode:
+            controllers, anomalies, sent = asyncio.run(run_batched(request_details, headers_to_test, on_batch))
+            for i, result in enumerate(results):
+                if result is None:
+                    # Failed with its whole batch but never got a request of its own
+                    results[i] = (headers_to_test[i], "FAILED", 0, False, False)
+                elif i + 1 in anomalies:
+                    results[i] = result[:4] + (True,)
+        elif len(skip) == len(headers_to_test):
+            pass  # Everything was already tested before the interruption
+        elif engine == 'async':
+            controllers = asyncio.run(run_async(request_details, headers_to_test, on_response, skip))
+        else:
+            run_sync(request_details, headers_to_test, on_response, skip)
+    except KeyboardInterrupt:
+        tested = sum(result is not None for result in results)
+        print(f"\nInterrupted after {tested} of {len(headers_to_test)} headers"
+              + (f", rerun with --resume to continue from {args.journal}" if journal is not None else ""))
+        return
+    finally:
+        if journal is not None:
+            journal.close()
+        metrics.export(args.metrics)
+    
+    # Record reflected and response-changing headers in wordlist order
+    reflected_headers = [result[0] for result in results if result[3]]
+    changed_headers = [result for result in results if result[4]]
+    
+    # Print summary
+    print("\n" + "="*80)
+    print("TESTING COMPLETE - SUMMARY")
+    print("="*80)
+    
+    
+    # Print detailed results
+    print("\nDetailed Results:")
+    print("-"*80)
+    print("Header".ljust(30) + "Status".ljust(10) + "Length".ljust(10) + "Reflected".ljust(12) + "Changed")
+    print("-"*80)
+    for header, status, length, reflected, changed in results:
+        print(f"{header[:28].ljust(30)}{str(status).ljust(10)}{str(length).ljust(10)}{str(reflected).ljust(12)}{changed}")
+    # Print status code summary
+    print("\nStatus Codes Received:")
+    for code, count in sorted(status_codes.items()):
+        print(f"  {code}: {count} requests")
+    
+    # Print reflected headers
+    print(f"\nHeaders with reflected values ({len(reflected_headers)}):")
+    for header in reflected_headers:
+        print(f"  {header}")
+    
+    # Print headers that changed the response compared to the baseline
+    print(f"\nHeaders that changed the response ({len(changed_headers)}):")
+    for header, status, length, _, _ in changed_headers:
+        print(f"  {header} (Status: {status}, Length: {length})")
+    
+    if sent is not None:
+        print(f"\nRequests sent: {sent} for {len(headers_to_test)} headers")
+    
+    # Print what the rate controller settled on
+    if controllers and ADAPTIVE_RATE_CONTROL:
+        print("\nRate Control:")
+        for host, controller in controllers.items():
+            print(f"  {host}: concurrency {int(controller.limit)}, {controller.rate:.1f} req/s, "
+                  f"{controller.throttled} throttled, {controller.errors} errors, "
+                  f"{controller.retries} retries, error rate {controller.error_rate:.1%}")
+    
+    # Print where the time went
+    metrics.print_report()
+    print(f"\nMetrics written to: {args.metrics}")
+
+def main_multi_target(args):
+    """Scan every target in args.targets with the async engine"""
+    if httpx is None:
+        print("Scanning several targets needs httpx (pip install 'httpx[http2]')")
+        return
+    
+    try:
+        targets = load_targets(args.targets)
+    except FileNotFoundError:
+        print(f"Error: Targets file not found at {args.targets}")
+        return
+    if not targets:
+        print("No targets to scan.")
+        return
+    
+    try:
+        headers_to_test = load_headers(HEADERS_FILE_PATH)
+    except FileNotFoundError:
+        print(f"Error: Headers file not found at {HEADERS_FILE_PATH}")
+        return
+    except KeyError as e:
+        print(f"Error: {e.args[0]}")
+        return
+    
+    hosts = {urlparse(target['url']).netloc for target in targets}
+    print(f"\nTargets: {len(targets)} on {len(hosts)} hosts")
+    print(f"Testing with header value: '{HEADER_VALUE}'")
+    print(f"Concurrency: {CONCURRENCY} overall, {PER_HOST_CONCURRENCY} per host")
+    print(f"Batch mode: {'ENABLED' if args.batch else 'DISABLED'}")
+    print(f"Loaded {len(headers_to_test)} headers to test")
+    print("="*80)
+    
+    journal = None if args.batch else ScanJournal(args.journal, args.resume)
+    metrics = ProbeMetrics()
+    try:
+        run_multi_target(targets, headers_to_test, args.output, args.batch, journal, metrics)
+    finally:
+        if journal is not None:
+            journal.close()
+        metrics.export(args.metrics)
+    print(f"\nMetrics written to: {args.metrics}")
+
+if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Wordlist Pack
+Compiles overlapping wordlists into one deduplicated, tiered binary pack that tools can mmap
+"""
+
+import argparse
+import array
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+
+MAGIC = b"WLPK"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIII")  # magic, version, flags, entries, tiers, metadata bytes
+TIER = struct.Struct("<16sI")  # tier name, entries in the tier
+FLAG_CASEFOLD = 1
+DEFAULT_TIERS = "small:1000,medium:10000"
+
+def normalize(line):
+    """Strip whitespace, a BOM and CR, return None for blank lines and comments"""
+    line = line.strip().lstrip('\ufeff').strip()
+    if not line or line.startswith('#'):
+        return None
+    return line
+
+def read_entries(file_path):
+    """Normalized entries of a text wordlist, in file order"""
+    with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+        for line in f:
+            entry = normalize(line)
+            if entry is not None:
+                yield entry
+
+def rank_entries(sources, casefold=False):
+    """
+    Deduplicate the entries of all sources and order them by how many
+    sources contain them (more first), then by where they first appeared.
+    Entries most lists agree on come first, so every tier is a prefix.
+    """
+    seen = {}  # key -> [sources containing it, first position, first spelling]
+    position = 0
+    for source in sources:
+        in_source = set()
+        for entry in read_entries(source):
+            key = entry.casefold() if casefold else entry
+            if key in in_source:
+                continue
+            in_source.add(key)
+            info = seen.get(key)
+            if info is None:
+                seen[key] = [1, position, entry]
+            else:
+                info[0] += 1
+            position += 1
+    return [info[2] for info in sorted(seen.values(), key=lambda info: (-info[0], info[1]))]
+
+def parse_tiers(spec):
+    """'small:1000,medium:10000' -> [('small', 1000), ('medium', 10000)]"""
+    tiers = []
+    for part in spec.split(','):
+        if not part.strip():
+            continue
+        name, _, count = part.partition(':')
+        tiers.append((name.strip(), int(count)))
+    return tiers
+
+def write_pack(output_file, entries, tiers, casefold=False, sources=()):
+    """
+    Write entries as a pack: header, tier table, JSON metadata, an offset
+    table of entries + 1 little-endian u32s and the UTF-8 entries back to
+    back. The last tier, 'large', always holds every entry.
+    """
+    tiers = [(name, min(count, len(entries))) for name, count in tiers if name != 'large']
+    tiers.append(('large', len(entries)))
+    metadata = json.dumps({
+        "sources": [os.path.basename(source) for source in sources],
+        "built": time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }).encode('utf-8')
+
+    encoded = [entry.encode('utf-8') for entry in entries]
+    offsets = [0]
+    for data in encoded:
+        offsets.append(offsets[-1] + len(data))
+    if offsets[-1] >= 1 << 32:
+        raise ValueError("Wordlist too large for a pack (4 GiB of entries)")
+
+    with open(output_file, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, FLAG_CASEFOLD if casefold else 0, len(entries), len(tiers), len(metadata)))
+        for name, count in tiers:
+            f.write(TIER.pack(name.encode('utf-8')[:16], count))
+        f.write(metadata)
+        f.write(struct.pack(f"<{len(offsets)}I", *offsets))
+        f.writelines(encoded)
+
+class WordlistPack:
+    """
+    Read-only view of a pack through mmap. Entries are decoded only when
+    accessed, so opening a pack costs the same whatever its size.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, flags, count, tier_count, metadata_size = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self.mm.close()
+            raise ValueError(f"{path} is not a version {VERSION} wordlist pack")
+        self.casefold = bool(flags & FLAG_CASEFOLD)
+        self.count = count
+
+        position = HEADER.size
+        self.tiers = {}
+        for _ in range(tier_count):
+            name, tier_size = TIER.unpack_from(self.mm, position)
+            self.tiers[name.rstrip(b'\0').decode('utf-8')] = tier_size
+            position += TIER.size
+        self.metadata = json.loads(self.mm[position:position + metadata_size])
+        position += metadata_size
+
+        self.offsets = memoryview(self.mm)[position:position + 4 * (count + 1)].cast('I')
+        if sys.byteorder != 'little':
+            self.offsets.release()
+            self.offsets = array.array('I', self.mm[position:position + 4 * (count + 1)])
+            self.offsets.byteswap()
+        self.data_start = position + 4 * (count + 1)
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        start = self.data_start + self.offsets[index]
+        return self.mm[start:self.data_start + self.offsets[index + 1]].decode('utf-8')
+
+    def __iter__(self):
+        return self.iter_range(0, self.count)
+
+    def iter_range(self, start, stop):
+        """Entries start..stop-1, decoded lazily"""
+        offsets = self.offsets
+        base = self.data_start
+        mm = self.mm
+        for index in range(start, min(stop, self.count)):
+            yield mm[base + offsets[index]:base + offsets[index + 1]].decode('utf-8')
+
+    def tier(self, name=None):
+        """Entries of a tier (nested: small is a prefix of medium, medium of large), all if name is None"""
+        if name is None:
+            return iter(self)
+        if name not in self.tiers:
+            raise KeyError(f"No tier '{name}' in {self.path} (tiers: {', '.join(self.tiers)})")
+        return self.iter_range(0, self.tiers[name])
+
+    def close(self):
+        if isinstance(self.offsets, memoryview):
+            self.offsets.release()
+        self.mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def is_pack(path):
+    """True if path is a wordlist pack rather than a text wordlist"""
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+def load_wordlist(path, tier=None):
+    """
+    Entries of a pack (optionally one tier of it) or of a text wordlist,
+    one per line with blank lines and # comments skipped
+    """
+    if is_pack(path):
+        with WordlistPack(path) as pack:
+            return list(pack.tier(tier))
+    return list(read_entries(path))
+
+def build(args):
+    missing = [source for source in args.sources if not os.path.isfile(source)]
+    if missing:
+        print(f"Error: Wordlist not found: {', '.join(missing)}")
+        sys.exit(1)
+    try:
+        tiers = parse_tiers(args.tiers)
+    except ValueError:
+        print("Error: --tiers must look like small:1000,medium:10000")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    total = sum(1 for source in args.sources for _ in read_entries(source))
+    entries = rank_entries(args.sources, args.casefold)
+    write_pack(args.output, entries, tiers, args.casefold, args.sources)
+
+    with WordlistPack(args.output) as pack:
+        print(f"[+] {total} lines from {len(args.sources)} wordlists -> {len(pack)} unique entries "
+              f"({total - len(pack)} duplicates dropped) in {time.perf_counter() - start:.2f}s")
+        for name, count in pack.tiers.items():
+            print(f"    - {name.ljust(8)} {count} entries")
+    print(f"[+] Pack written to: {args.output} ({os.path.getsize(args.output):,} bytes)")
+
+def info(args):
+    with WordlistPack(args.pack) as pack:
+        print(f"Entries: {len(pack)}{' (case-insensitive)' if pack.casefold else ''}")
+        print(f"Built: {pack.metadata.get('built')}")
+        print(f"Sources: {', '.join(pack.metadata.get('sources', []))}")
+        for name, count in pack.tiers.items():
+            print(f"  {name.ljust(8)} {count}")
+
+def dump(args):
+    with WordlistPack(args.pack) as pack:
+        for entry in pack.tier(args.tier):
+            sys.stdout.write(entry + "\n")
+
+def main():
+    parser = argparse.ArgumentParser(description='Compile wordlists into deduplicated, tiered, mmap-able packs')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = commands.add_parser('build', help='Compile text wordlists into a pack')
+    build_parser.add_argument('sources', nargs='+', help='Text wordlists, the first ones win ties')
+    build_parser.add_argument('-o', '--output', required=True, help='Pack file to write')
+    build_parser.add_argument('--tiers', default=DEFAULT_TIERS,
+                              help=f"Nested tier sizes, 'large' is always everything (default: {DEFAULT_TIERS})")
+    build_parser.add_argument('--casefold', action='store_true',
+                              help='Treat entries differing only in case as duplicates (e.g. header names)')
+
+    info_parser = commands.add_parser('info', help='Show what a pack contains')
+    info_parser.add_argument('pack')
+
+    dump_parser = commands.add_parser('dump', help='Print the entries of a pack, one per line')
+    dump_parser.add_argument('pack')
+    dump_parser.add_argument('--tier', help='Only this tier (default: everything)')
+
+    args = parser.parse_args()
+    try:
+        {'build': build, 'info': info, 'dump': dump}[args.command](args)
+    except BrokenPipeError:
+        # Piped into head or similar, which stopped reading
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()